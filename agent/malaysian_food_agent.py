@@ -1,12 +1,139 @@
 """Malaysian Food Agent using Strands framework with dual skills."""
 
 import asyncio
-from typing import List, Dict, Union
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, List, Dict, Optional, Tuple, Union
+import orjson
 from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
 from strands.models import BedrockModel
 from skills.food_knowledge_skill import FoodKnowledgeSkill
 from skills.restaurant_finder_skill import RestaurantFinderSkill
 from services.mongodb import MongoDBFoodKnowledgeService
+from services.response_cache import SemanticResponseCache
+from services.tavily import TavilyService
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of turns kept per conversation session
+HISTORY_SIZE = 20
+
+# Default session for callers that don't track sessions (e.g. the CLI)
+DEFAULT_SESSION = "default"
+
+# Start of the reply returned when a query fails
+ERROR_REPLY = "I apologize, but I encountered an error"
+
+# Maximum conversation sessions kept in memory (least recently used are dropped)
+MAX_SESSIONS = 256
+
+# Maximum number of exact-match query responses kept in memory
+EXACT_CACHE_SIZE = 512
+
+# Static system prompt, shared by every agent instance
+_SYSTEM_INSTRUCTIONS = """You are a Malaysian food expert with two specialized capabilities:
+
+1. **Food Knowledge**: You have deep knowledge about Malaysian dishes stored in a database including:
+   - Detailed ingredient lists and cooking methods
+   - Cultural significance and history
+   - Taste profiles and dietary information
+   - Regional origins and traditional pairings
+   - Cuisine types: Malay, Chinese Malaysian, Indian Malaysian, Nyonya/Peranakan, Mamak
+
+2. **Restaurant Finder**: You can search the web using Tavily tools to find actual restaurants including:
+   - Current restaurant locations and contact information
+   - Reviews and ratings from food blogs and review sites
+   - Best areas and neighborhoods for specific cuisines
+   - Halal restaurant options
+
+**Your Role**:
+- Help users discover Malaysian dishes and understand their cultural context
+- Find restaurants where users can try specific dishes
+- Recommend dishes based on preferences (taste, dietary needs, meal time)
+- Explain the significance of Malaysian food culture
+- Guide users to authentic food experiences across Malaysia
+
+**How to Help Users**:
+1. When users ask about a DISH (what it is, ingredients, how it's made):
+   - Use Food Knowledge skill to search dishes and provide detailed information
+   - For a single named dish, one get_dish_details call covers ingredients and dietary info
+   - Explain cultural significance and typical pairings
+   - Suggest similar dishes they might enjoy
+   - To list dishes meeting dietary needs (halal, vegetarian, vegan, gluten-free), use find_dishes_by_diet
+
+2. When users ask WHERE to find food or restaurant locations:
+   - Use Restaurant Finder skill to search for actual restaurants
+   - For a broad "where can I eat X in Y" question, find_restaurants_comprehensive covers general, halal, blog and area searches in one call
+   - Provide specific locations, areas, and current information
+   - Suggest best neighborhoods or areas for specific cuisines
+
+3. When users need both:
+   - First explain the dish using Food Knowledge
+   - Then find restaurants using Restaurant Finder
+   - Provide a complete recommendation with context and locations
+
+**Malaysian Cuisine Types**:
+- Malay: Nasi lemak, rendang, satay
+- Chinese Malaysian: Char koay teow, hokkien mee, bak kut teh
+- Indian Malaysian: Roti canai, banana leaf rice
+- Nyonya/Peranakan: Laksa, ayam pongteh
+- Mamak: Nasi kandar, teh tarik
+
+Be enthusiastic, knowledgeable, and helpful. Celebrate Malaysian food culture!"""
+
+
+def prompt_cache_options(model_id: str) -> Dict[str, str]:
+    """
+    Get the BedrockModel prompt caching options supported by a model.
+
+    Bedrock caches tool specs only for Anthropic Claude models; Amazon Nova
+    supports system and message checkpoints. The system checkpoint only
+    takes effect once the prompt reaches the model's minimum cacheable
+    length (1K tokens for Nova), which the current prompt is below, so
+    until it grows cache_prompt is requested but has no effect.
+
+    Args:
+        model_id: Bedrock model ID (or inference profile ID)
+
+    Returns:
+        Keyword arguments for BedrockModel
+    """
+    options = {"cache_prompt": "default"}
+    if "anthropic.claude" in model_id:
+        options["cache_tools"] = "default"
+    return options
+
+
+def normalize_query(user_query: str) -> str:
+    """
+    Normalize a query into a cache key.
+
+    Case, extra whitespace and trailing punctuation are ignored, so
+    "Nasi Lemak?" and "nasi  lemak" share a key. Word order is kept:
+    "KL to Penang" and "Penang to KL" are different questions.
+
+    Args:
+        user_query: Raw user query
+
+    Returns:
+        Lowercase query with single spaces
+    """
+    return " ".join(user_query.lower().split()).rstrip("?!. ")
+
+
+class _Session:
+    """One conversation: its own Strands agent (model context) and display history."""
+
+    __slots__ = ("agent", "lock", "history")
+
+    def __init__(self, agent: Agent):
+        self.agent = agent
+        # A Strands Agent runs one invocation at a time (it raises
+        # ConcurrencyException otherwise), so the session's turns queue here
+        self.lock = asyncio.Lock()
+        self.history: Deque[Dict[str, str]] = deque(maxlen=HISTORY_SIZE)
 
 
 class MalaysianFoodAgent:
@@ -19,31 +146,40 @@ class MalaysianFoodAgent:
     def __init__(
         self,
         mongo_service: MongoDBFoodKnowledgeService,
-        model: Union[BedrockModel, str] = None
+        tavily_service: TavilyService,
+        model: Union[BedrockModel, str] = None,
+        response_cache: Optional[SemanticResponseCache] = None,
     ):
         """
         Initialize Malaysian Food Agent.
 
         Args:
             mongo_service: MongoDB service for food knowledge
+            tavily_service: Tavily service for restaurant web search
             model: BedrockModel instance or model string (BedrockModel recommended)
+            response_cache: Optional semantic cache for answering similar queries
         """
         self.mongo_service = mongo_service
+        self.tavily_service = tavily_service
+        self.response_cache = response_cache
 
         # Initialize skills
         self.food_knowledge_skill = FoodKnowledgeSkill(mongo_service)
-        self.restaurant_finder_skill = RestaurantFinderSkill()
+        self.restaurant_finder_skill = RestaurantFinderSkill(tavily_service)
 
-        # Collect all skill methods
-        skills = []
-        skills.extend([
+        # Collect all skill methods. Sorted by tool name so the serialized tool
+        # specs are byte-identical across processes (keeps Bedrock prompt cache warm).
+        # @tool builds each spec and input model when the class body runs; binding
+        # to the instance here reuses them, so tool calls never re-inspect signatures
+        skills = tuple(sorted((
             self.food_knowledge_skill.search_dishes,
+            self.food_knowledge_skill.get_dish_details,
             self.food_knowledge_skill.get_dish_ingredients,
             self.food_knowledge_skill.get_dietary_info,
             self.food_knowledge_skill.explore_cuisine_type,
-        ])
-        skills.extend([
+            self.food_knowledge_skill.find_dishes_by_diet,
             self.restaurant_finder_skill.find_restaurants,
+            self.restaurant_finder_skill.find_restaurants_comprehensive,
             self.restaurant_finder_skill.find_halal_restaurants,
             self.restaurant_finder_skill.find_restaurants_by_cuisine,
             self.restaurant_finder_skill.get_restaurant_reviews,
@@ -52,21 +188,27 @@ class MalaysianFoodAgent:
             self.restaurant_finder_skill.extract_restaurant_details,
             self.restaurant_finder_skill.crawl_restaurant_website,
             self.restaurant_finder_skill.map_restaurant_website,
-        ])
+        ), key=lambda skill: skill.tool_name))
 
-        # Create Strands agent
-        self.agent = Agent(
-            name="Malaysian Food Expert",
-            model=model,
-            system_prompt=self._get_system_instructions(),
-            tools=skills
-        )
+        # Each session gets its own Strands agent built from these, so one
+        # user's turns never enter another user's model context
+        self._model = model
+        self._tools = list(skills)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+
+        self._exact_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
 
-        self.conversation_history: List[Dict[str, str]] = []
+        # Dedicated event loop for the synchronous query() wrapper
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
 
     def initialize(self) -> None:
         """Initialize all services."""
         self.mongo_service.connect()
+        if self.response_cache:
+            self.response_cache.connect()
         print("Malaysian Food Agent initialized with dual skills:")
         print("  - Food Knowledge Skill (MongoDB vector search)")
         print("  - Restaurant Finder Skill (Tavily web search, extract, crawl, map)")
@@ -74,112 +216,284 @@ class MalaysianFoodAgent:
     def shutdown(self) -> None:
         """Shutdown all services."""
         self.mongo_service.disconnect()
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
         print("Malaysian Food Agent shutdown")
 
+    def _new_agent(self) -> Agent:
+        """Create a Strands agent with a fresh conversation."""
+        return Agent(
+            name="Malaysian Food Expert",
+            model=self._model,
+            system_prompt=self._get_system_instructions(),
+            tools=self._tools,
+            # Bound the context sent to the model on every call
+            conversation_manager=SlidingWindowConversationManager(window_size=HISTORY_SIZE),
+        )
+
     def _get_system_instructions(self) -> str:
         """Get system instructions for the agent."""
-        return """You are a Malaysian food expert with two specialized capabilities:
+        return _SYSTEM_INSTRUCTIONS
 
-1. **Food Knowledge**: You have deep knowledge about Malaysian dishes stored in a database including:
-   - Detailed ingredient lists and cooking methods
-   - Cultural significance and history
-   - Taste profiles and dietary information
-   - Regional origins and traditional pairings
-   - Cuisine types: Malay, Chinese Malaysian, Indian Malaysian, Nyonya/Peranakan, Mamak
-
-2. **Restaurant Finder**: You can search the web using Tavily tools to find actual restaurants including:
-   - Current restaurant locations and contact information
-   - Reviews and ratings from food blogs and review sites
-   - Best areas and neighborhoods for specific cuisines
-   - Halal restaurant options
-
-**Your Role**:
-- Help users discover Malaysian dishes and understand their cultural context
-- Find restaurants where users can try specific dishes
-- Recommend dishes based on preferences (taste, dietary needs, meal time)
-- Explain the significance of Malaysian food culture
-- Guide users to authentic food experiences across Malaysia
-
-**How to Help Users**:
-1. When users ask about a DISH (what it is, ingredients, how it's made):
-   - Use Food Knowledge skill to search dishes and provide detailed information
-   - Explain cultural significance and typical pairings
-   - Suggest similar dishes they might enjoy
-
-2. When users ask WHERE to find food or restaurant locations:
-   - Use Restaurant Finder skill to search for actual restaurants
-   - Provide specific locations, areas, and current information
-   - Suggest best neighborhoods or areas for specific cuisines
-
-3. When users need both:
-   - First explain the dish using Food Knowledge
-   - Then find restaurants using Restaurant Finder
-   - Provide a complete recommendation with context and locations
-
-**Malaysian Cuisine Types**:
-- Malay: Nasi lemak, rendang, satay
-- Chinese Malaysian: Char koay teow, hokkien mee, bak kut teh
-- Indian Malaysian: Roti canai, banana leaf rice
-- Nyonya/Peranakan: Laksa, ayam pongteh
-- Mamak: Nasi kandar, teh tarik
-
-Be enthusiastic, knowledgeable, and helpful. Celebrate Malaysian food culture!"""
-
-    async def query_async(self, user_query: str, verbose: bool = True) -> str:
+    async def query_async(
+        self,
+        user_query: str,
+        verbose: bool = False,
+        session_id: str = DEFAULT_SESSION,
+    ) -> str:
         """
         Process a user query about Malaysian food (async version).
 
         Args:
             user_query: User's question or request
             verbose: Show thinking process and tool calls
+            session_id: Conversation session the query belongs to
 
         Returns:
             Agent's response
         """
         try:
-            self.conversation_history.append({
+            session = self._session(session_id)
+            follow_up = self._is_follow_up(session)
+            session.history.append({
                 "role": "user",
                 "content": user_query
             })
+            if follow_up:
+                return await self._answer(user_query, verbose, session_id, use_cache=False)
+
+            # Identical queries already being answered share one agent run
+            cache_key = normalize_query(user_query)
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                response_text = await asyncio.shield(inflight)
+                await self._record_cached(session_id, cache_key, user_query, response_text)
+                return response_text
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+            try:
+                response_text = await self._answer(user_query, verbose, session_id)
+                future.set_result(response_text)
+                return response_text
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved in case nobody else is waiting
+                raise
+            finally:
+                if not future.done():
+                    future.cancel()
+                del self._inflight[cache_key]
 
-            # Use Strands agent to process query with both skills
-            response = await self.agent.invoke_async(user_query)
-
-            # Show thinking process if verbose
-            if verbose:
-                # The response from Strands contains thinking blocks and tool calls
-                # Let's print them if available
-                if hasattr(response, 'messages'):
-                    for msg in response.messages:
-                        if hasattr(msg, 'type'):
-                            if msg.type == 'thinking':
-                                print(f"\033[93m💭 Thinking: {msg.content}\033[0m")
-                            elif msg.type == 'tool_use':
-                                print(f"\033[96m🔧 Tool Call: \033[1m{msg.name}\033[0m")
-                                if hasattr(msg, 'input') and msg.input:
-                                    import json
-                                    print(f"\033[96m   Parameters: {json.dumps(msg.input, indent=2)}\033[0m")
-
-            # Extract response text
-            response_text = str(response.content) if hasattr(response, 'content') else str(response)
-
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response_text
-            })
+        except Exception as e:
+            logger.exception("Error processing query")
+            return f"{ERROR_REPLY}: {str(e)}. Please try again."
+
+    async def _answer(
+        self, user_query: str, verbose: bool, session_id: str, use_cache: bool = True
+    ) -> str:
+        """Answer a query from the caches (when use_cache) or the Strands agent."""
+        cache_key, query_embedding = None, None
+        if use_cache:
+            cache_key, query_embedding, cached = await self._lookup_cached(user_query)
+            if cached is not None:
+                await self._record_cached(session_id, cache_key, user_query, cached)
+                return cached
+
+        # Use Strands agent to process query with both skills. Not retried here:
+        # a partial turn is already in the conversation, and BedrockModel
+        # retries throttling itself
+        session = self._session(session_id)
+        async with session.lock:
+            response = await session.agent.invoke_async(user_query)
+
+        # Show thinking process if verbose (printed off the event loop)
+        if verbose:
+            await asyncio.to_thread(self._render_trace, response)
+
+        # Extract response text
+        response_text = str(response.content) if hasattr(response, 'content') else str(response)
+
+        await self._store_response(
+            session_id, cache_key, user_query, query_embedding, response_text
+        )
 
-            return response_text
+        return response_text
 
-        except Exception as e:
-            print(f"\033[91mError processing query: {e}\033[0m")
-            import traceback
-            traceback.print_exc()
-            return f"I apologize, but I encountered an error: {str(e)}. Please try again."
+    async def warm_cache(self, hint: str) -> None:
+        """
+        Warm the Bedrock and MongoDB connections ahead of the next query.
+
+        Args:
+            hint: Text likely related to the next query (e.g. the last one)
+        """
+        try:
+            await asyncio.to_thread(self.mongo_service.vector_search, hint, 1)
+        except Exception:
+            logger.debug("Cache warm-up failed", exc_info=True)
+
+    def _render_trace(self, response) -> None:
+        """Print thinking blocks and tool calls from a Strands response."""
+        # The response from Strands contains thinking blocks and tool calls
+        for msg in getattr(response, 'messages', ()):
+            msg_type = getattr(msg, 'type', None)
+            if msg_type == 'thinking':
+                print(f"\033[93m💭 Thinking: {msg.content}\033[0m")
+            elif msg_type == 'tool_use':
+                print(f"\033[96m🔧 Tool Call: \033[1m{msg.name}\033[0m")
+                tool_input = getattr(msg, 'input', None)
+                if tool_input:
+                    print(f"\033[96m   Parameters: {orjson.dumps(tool_input, option=orjson.OPT_INDENT_2).decode()}\033[0m")
+
+    async def stream_async(
+        self, user_query: str, session_id: str = DEFAULT_SESSION
+    ) -> AsyncIterator[str]:
+        """
+        Process a user query, yielding response text as it is generated.
+
+        Cached responses are yielded as a single chunk.
+
+        Args:
+            user_query: User's question or request
+            session_id: Conversation session the query belongs to
+
+        Yields:
+            Response text deltas
+        """
+        session = self._session(session_id)
+        follow_up = self._is_follow_up(session)
+        session.history.append({
+            "role": "user",
+            "content": user_query
+        })
+
+        cache_key, query_embedding = None, None
+        if not follow_up:
+            cache_key, query_embedding, cached = await self._lookup_cached(user_query)
+            if cached is not None:
+                await self._record_cached(session_id, cache_key, user_query, cached)
+                yield cached
+                return
+
+        chunks = []
+        response_text = None
+        async with session.lock:
+            async for event in session.agent.stream_async(user_query):
+                if "data" in event:
+                    chunks.append(event["data"])
+                    yield event["data"]
+                elif "result" in event:
+                    # Final answer only, without text emitted before tool calls
+                    response_text = str(event["result"])
+
+        await self._store_response(
+            session_id, cache_key, user_query, query_embedding,
+            response_text or "".join(chunks),
+        )
+
+    async def _lookup_cached(
+        self, user_query: str
+    ) -> Tuple[str, Optional[List[float]], Optional[str]]:
+        """
+        Look up a query in the exact-match and semantic caches.
+
+        Returns:
+            Tuple of (exact cache key, query embedding if computed, cached response or None)
+        """
+        # Identical queries skip embedding and the agent entirely
+        cache_key = normalize_query(user_query)
+        cached = self._exact_cache.get(cache_key)
+        if cached is not None:
+            self._exact_cache.move_to_end(cache_key)
+            return cache_key, None, cached
+
+        # Serve semantically similar queries from the response cache
+        query_embedding = None
+        if self.response_cache:
+            query_embedding = await asyncio.to_thread(self.response_cache.embed, user_query)
+            cached = await asyncio.to_thread(self.response_cache.get, user_query, query_embedding)
+
+        return cache_key, query_embedding, cached
+
+    async def _store_response(
+        self,
+        session_id: str,
+        cache_key: Optional[str],
+        user_query: str,
+        query_embedding: Optional[List[float]],
+        response_text: str,
+    ) -> None:
+        """Record a freshly generated response and add it to the caches (unless cache_key is None)."""
+        self._record_response(session_id, cache_key, response_text)
+
+        if self.response_cache and cache_key is not None:
+            await asyncio.to_thread(
+                self.response_cache.put, user_query, query_embedding, response_text
+            )
+
+    def _session(self, session_id: str) -> _Session:
+        """Get (or create) a session, evicting the least recently used beyond MAX_SESSIONS."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session(self._new_agent())
+            if len(self._sessions) > MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    @staticmethod
+    def _is_follow_up(session: _Session) -> bool:
+        """
+        Check whether a session already has turns.
+
+        Follow-ups ("where can I get it in Penang?") depend on the
+        conversation, so they skip the caches shared across sessions.
+        """
+        return bool(session.history)
+
+    async def _record_cached(
+        self, session_id: str, cache_key: str, user_query: str, response_text: str
+    ) -> None:
+        """
+        Record a response served without running the session's agent.
+
+        The turn is also added to the agent's conversation, so a follow-up
+        ("where can I get it in KL?") still knows what was asked.
+        """
+        session = self._session(session_id)
+        async with session.lock:
+            session.agent.messages.extend([
+                {"role": "user", "content": [{"text": user_query}]},
+                {"role": "assistant", "content": [{"text": response_text}]},
+            ])
+        self._record_response(session_id, cache_key, response_text)
+
+    def _record_response(
+        self, session_id: str, cache_key: Optional[str], response_text: str
+    ) -> None:
+        """Append the assistant turn and remember it in the exact-match cache (unless cache_key is None)."""
+        self._session(session_id).history.append({
+            "role": "assistant",
+            "content": response_text
+        })
+
+        if cache_key is None:
+            return
+        self._exact_cache[cache_key] = response_text
+        if len(self._exact_cache) > EXACT_CACHE_SIZE:
+            self._exact_cache.popitem(last=False)
 
     def query(self, user_query: str, verbose: bool = False) -> str:
         """
         Synchronous wrapper for query_async.
 
+        Runs on the agent's background event loop, so it is safe to call
+        from threads and avoids creating a new loop per call. Async callers
+        (e.g. the FastAPI app) should await query_async directly instead.
+
         Args:
             user_query: User's question or request
             verbose: Show thinking process and tool calls
@@ -187,12 +501,16 @@ Be enthusiastic, knowledgeable, and helpful. Celebrate Malaysian food culture!""
         Returns:
             Agent's response
         """
-        return asyncio.run(self.query_async(user_query, verbose))
+        future = asyncio.run_coroutine_threadsafe(
+            self.query_async(user_query, verbose), self._loop
+        )
+        return future.result()
 
-    def clear_history(self) -> None:
-        """Clear conversation history."""
-        self.conversation_history = []
+    def clear_history(self, session_id: str = DEFAULT_SESSION) -> None:
+        """Clear conversation history for a session, including the model's context."""
+        self._sessions.pop(session_id, None)
 
-    def get_history(self) -> List[Dict[str, str]]:
-        """Get conversation history."""
-        return self.conversation_history.copy()
+    def get_history(self, session_id: str = DEFAULT_SESSION) -> List[Dict[str, str]]:
+        """Get conversation history for a session."""
+        session = self._sessions.get(session_id)
+        return list(session.history) if session else []
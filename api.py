@@ -2,28 +2,64 @@
 
 import os
 import asyncio
+import uuid
 from typing import Dict, List, Optional
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import orjson
 from dotenv import load_dotenv
 
 from strands.models import BedrockModel
 from services.bedrock import BedrockService
+from services.embedding_cache import MongoEmbeddingCache
 from services.mongodb import MongoDBFoodKnowledgeService
-from agent.malaysian_food_agent import MalaysianFoodAgent
+from services.response_cache import SemanticResponseCache
+from services.tavily import TavilyService
+from agent.malaysian_food_agent import MalaysianFoodAgent, prompt_cache_options
+from utils.log import configure_logging
 
 # Load environment variables
 load_dotenv(override=True)
 
+# Log through a background thread so errors never block the event loop
+configure_logging()
+
+# Web interface assets
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Example queries offered in the web interface, answered ahead of time
+WARMUP_QUERIES = [
+    "What is Nasi Lemak and what ingredients does it have?",
+    "Where can I find the best Char Koay Teow in Penang?",
+    "What are some good vegetarian Malaysian dishes?",
+    "Tell me about Rendang and where I can try it",
+]
+
+# Maximum batch queries answered at once (each runs its own agent)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
 # Global agent instance
 agent: Optional[MalaysianFoodAgent] = None
 
 
+async def warm_up(agent: MalaysianFoodAgent) -> None:
+    """Populate the response caches with answers to the example queries."""
+    # One fresh session per query: a later query in a shared session would be a
+    # follow-up and bypass the caches it is meant to fill
+    for i, query in enumerate(WARMUP_QUERIES):
+        session_id = f"warmup-{i}"
+        await agent.query_async(query, verbose=False, session_id=session_id)
+        agent.clear_history(session_id)
+    print("✓ Example queries warmed up")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup resources."""
@@ -46,30 +82,70 @@ async def lifespan(app: FastAPI):
         database=os.getenv("MONGODB_DATABASE", "food_places_db"),
         collection=os.getenv("MONGODB_COLLECTION", "dishes"),
         bedrock_service=bedrock_service,
+        # Each worker process has its own pool, so keep it small
+        max_pool_size=int(os.getenv("MONGODB_MAX_POOL_SIZE", "25")),
     )
 
+    # Initialize Tavily service (one pooled HTTP session for all restaurant searches)
+    tavily_service = TavilyService(api_key=os.getenv("TAVILY_API_KEY"))
+
     # Create BedrockModel for Amazon Nova Pro
+    model_id = os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0")
     bedrock_model = BedrockModel(
-        model_id=os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0"),
+        model_id=model_id,
         region_name=os.getenv("AWS_REGION", "us-east-1"),
         temperature=0.3,
+        # Cache the static system prompt (and tool specs, where the model supports it)
+        **prompt_cache_options(model_id),
+    )
+
+    # Semantic cache so repeated/similar questions skip the agent entirely
+    response_cache = SemanticResponseCache(
+        mongo_service=mongo_service,
+        collection=os.getenv("RESPONSE_CACHE_COLLECTION", "response_cache"),
+        threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95")),
     )
 
     # Create agent
     agent = MalaysianFoodAgent(
         mongo_service=mongo_service,
-        model=bedrock_model
+        tavily_service=tavily_service,
+        model=bedrock_model,
+        response_cache=response_cache,
     )
 
     # Initialize agent
     agent.initialize()
+
+    # Share query embeddings across workers and restarts; warm this worker's LRU
+    embedding_cache = MongoEmbeddingCache(
+        mongo_service=mongo_service,
+        collection=os.getenv("EMBEDDING_CACHE_COLLECTION", "embedding_cache"),
+    )
+    embedding_cache.connect()
+    bedrock_service.embedding_cache = embedding_cache
+    bedrock_service.preload_embeddings(embedding_cache.recent(1024))
     print("✓ Malaysian Food Agent API ready!")
 
+    # Answer the example queries in the background so startup isn't delayed
+    warmup_task = asyncio.create_task(warm_up(agent))
+
+    # Optionally search popular dish/location pairs ahead of time (spends Tavily credits)
+    prefetch_task = None
+    if tavily_service.api_key and os.getenv("TAVILY_PREFETCH") == "1":
+        prefetch_task = asyncio.create_task(agent.restaurant_finder_skill.prefetch_popular())
+
     yield
 
+    warmup_task.cancel()
+    if prefetch_task:
+        prefetch_task.cancel()
+
     # Cleanup
     if agent:
         agent.shutdown()
+        await agent.restaurant_finder_skill.close()
+    await tavily_service.close()
     print("✓ Malaysian Food Agent API stopped")
 
 
@@ -78,28 +154,38 @@ app = FastAPI(
     title="Malaysian Food Agent API",
     description="AI-powered Malaysian food expert with MongoDB vector search and Tavily web search",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Configure CORS
+# Configure CORS (set CORS_ORIGINS to a comma-separated list in production)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # The bundled web interface is same-origin; no cookies, so no credentials
+    allow_origins=os.getenv("CORS_ORIGINS", "http://localhost:8000").split(","),
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
+    max_age=86400,  # Let browsers cache preflight responses for 24h
 )
 
+# Compress larger responses (web interface, long agent answers)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Serve static assets with ETag/Last-Modified so browsers can revalidate
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
 
 # Request/Response models
 class QueryRequest(BaseModel):
     """Query request model."""
     query: str
+    session_id: str = "default"
 
     class Config:
         json_schema_extra = {
             "example": {
-                "query": "What is Nasi Lemak and where can I find it in Kuala Lumpur?"
+                "query": "What is Nasi Lemak and where can I find it in Kuala Lumpur?",
+                "session_id": "default"
             }
         }
 
@@ -110,6 +196,17 @@ class QueryResponse(BaseModel):
     query: str
 
 
+class BatchRequest(BaseModel):
+    """Batch query request model."""
+    queries: List[str] = Field(min_length=1, max_length=20)
+    session_id: str = "default"
+
+
+class BatchResponse(BaseModel):
+    """Batch query response model."""
+    responses: List[QueryResponse]
+
+
 class HistoryResponse(BaseModel):
     """Conversation history response."""
     history: List[Dict[str, str]]
@@ -124,370 +221,10 @@ class HealthResponse(BaseModel):
 
 
 # API Endpoints
-@app.get("/", response_class=HTMLResponse)
+@app.get("/", response_class=FileResponse)
 async def root():
     """Serve the web interface."""
-    return """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Malaysian Food Agent</title>
-        <style>
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }
-
-            .container {
-                max-width: 900px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-                overflow: hidden;
-            }
-
-            .header {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                text-align: center;
-            }
-
-            .header h1 {
-                font-size: 2.5em;
-                margin-bottom: 10px;
-            }
-
-            .header p {
-                font-size: 1.1em;
-                opacity: 0.9;
-            }
-
-            .chat-container {
-                height: 500px;
-                overflow-y: auto;
-                padding: 20px;
-                background: #f8f9fa;
-            }
-
-            .message {
-                margin-bottom: 20px;
-                animation: fadeIn 0.3s;
-            }
-
-            @keyframes fadeIn {
-                from { opacity: 0; transform: translateY(10px); }
-                to { opacity: 1; transform: translateY(0); }
-            }
-
-            .message.user {
-                text-align: right;
-            }
-
-            .message-content {
-                display: inline-block;
-                max-width: 80%;
-                padding: 15px 20px;
-                border-radius: 15px;
-                word-wrap: break-word;
-            }
-
-            .message.user .message-content {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border-bottom-right-radius: 5px;
-            }
-
-            .message.assistant .message-content {
-                background: white;
-                color: #333;
-                border: 1px solid #e0e0e0;
-                border-bottom-left-radius: 5px;
-                text-align: left;
-            }
-
-            .input-container {
-                padding: 20px;
-                background: white;
-                border-top: 1px solid #e0e0e0;
-            }
-
-            .input-row {
-                display: flex;
-                gap: 10px;
-            }
-
-            #queryInput {
-                flex: 1;
-                padding: 15px 20px;
-                border: 2px solid #e0e0e0;
-                border-radius: 25px;
-                font-size: 16px;
-                outline: none;
-                transition: border-color 0.3s;
-            }
-
-            #queryInput:focus {
-                border-color: #667eea;
-            }
-
-            button {
-                padding: 15px 30px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border: none;
-                border-radius: 25px;
-                font-size: 16px;
-                font-weight: 600;
-                cursor: pointer;
-                transition: transform 0.2s, box-shadow 0.2s;
-            }
-
-            button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-            }
-
-            button:active {
-                transform: translateY(0);
-            }
-
-            button:disabled {
-                opacity: 0.6;
-                cursor: not-allowed;
-                transform: none;
-            }
-
-            .loading {
-                text-align: center;
-                padding: 20px;
-                color: #666;
-            }
-
-            .examples {
-                padding: 20px;
-                background: #f8f9fa;
-                border-top: 1px solid #e0e0e0;
-            }
-
-            .examples h3 {
-                margin-bottom: 10px;
-                color: #333;
-            }
-
-            .example-chips {
-                display: flex;
-                flex-wrap: wrap;
-                gap: 10px;
-            }
-
-            .example-chip {
-                padding: 8px 16px;
-                background: white;
-                border: 1px solid #667eea;
-                color: #667eea;
-                border-radius: 20px;
-                cursor: pointer;
-                font-size: 14px;
-                transition: all 0.2s;
-            }
-
-            .example-chip:hover {
-                background: #667eea;
-                color: white;
-            }
-
-            .buttons-row {
-                display: flex;
-                gap: 10px;
-                margin-top: 10px;
-            }
-
-            .secondary-btn {
-                background: #6c757d;
-            }
-
-            .secondary-btn:hover {
-                box-shadow: 0 5px 15px rgba(108, 117, 125, 0.4);
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🍜 Malaysian Food Agent</h1>
-                <p>Your AI-powered guide to Malaysian cuisine</p>
-            </div>
-
-            <div class="chat-container" id="chatContainer">
-                <div class="message assistant">
-                    <div class="message-content">
-                        <strong>Welcome to Malaysian Food Agent!</strong><br><br>
-                        I'm your expert guide to Malaysian cuisine. I can help you:<br>
-                        • Learn about Malaysian dishes, ingredients, and recipes<br>
-                        • Find restaurants serving specific dishes<br>
-                        • Get dietary information (halal, vegetarian, etc.)<br>
-                        • Discover regional specialties<br><br>
-                        Ask me anything about Malaysian food!
-                    </div>
-                </div>
-            </div>
-
-            <div class="examples">
-                <h3>Try these examples:</h3>
-                <div class="example-chips">
-                    <span class="example-chip" onclick="sendExample('What is Nasi Lemak and what ingredients does it have?')">
-                        What is Nasi Lemak?
-                    </span>
-                    <span class="example-chip" onclick="sendExample('Where can I find the best Char Koay Teow in Penang?')">
-                        Best Char Koay Teow in Penang?
-                    </span>
-                    <span class="example-chip" onclick="sendExample('What are some good vegetarian Malaysian dishes?')">
-                        Vegetarian dishes
-                    </span>
-                    <span class="example-chip" onclick="sendExample('Tell me about Rendang and where I can try it')">
-                        About Rendang
-                    </span>
-                </div>
-            </div>
-
-            <div class="input-container">
-                <div class="input-row">
-                    <input
-                        type="text"
-                        id="queryInput"
-                        placeholder="Ask me about Malaysian food..."
-                        onkeypress="handleKeyPress(event)"
-                    >
-                    <button onclick="sendQuery()" id="sendBtn">Send</button>
-                </div>
-                <div class="buttons-row">
-                    <button onclick="clearHistory()" class="secondary-btn">Clear History</button>
-                </div>
-            </div>
-        </div>
-
-        <script>
-            const chatContainer = document.getElementById('chatContainer');
-            const queryInput = document.getElementById('queryInput');
-            const sendBtn = document.getElementById('sendBtn');
-
-            function scrollToBottom() {
-                chatContainer.scrollTop = chatContainer.scrollHeight;
-            }
-
-            function addMessage(role, content) {
-                const messageDiv = document.createElement('div');
-                messageDiv.className = `message ${role}`;
-
-                const contentDiv = document.createElement('div');
-                contentDiv.className = 'message-content';
-                contentDiv.innerHTML = content.replace(/\n/g, '<br>');
-
-                messageDiv.appendChild(contentDiv);
-                chatContainer.appendChild(messageDiv);
-                scrollToBottom();
-            }
-
-            function showLoading() {
-                const loadingDiv = document.createElement('div');
-                loadingDiv.className = 'loading';
-                loadingDiv.id = 'loading';
-                loadingDiv.innerHTML = '🤔 Thinking...';
-                chatContainer.appendChild(loadingDiv);
-                scrollToBottom();
-            }
-
-            function hideLoading() {
-                const loading = document.getElementById('loading');
-                if (loading) {
-                    loading.remove();
-                }
-            }
-
-            async function sendQuery() {
-                const query = queryInput.value.trim();
-                if (!query) return;
-
-                // Add user message
-                addMessage('user', query);
-                queryInput.value = '';
-
-                // Disable input
-                sendBtn.disabled = true;
-                queryInput.disabled = true;
-                showLoading();
-
-                try {
-                    const response = await fetch('/api/query', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify({ query }),
-                    });
-
-                    if (!response.ok) {
-                        throw new Error('Failed to get response');
-                    }
-
-                    const data = await response.json();
-                    hideLoading();
-                    addMessage('assistant', data.response);
-                } catch (error) {
-                    hideLoading();
-                    addMessage('assistant', '❌ Sorry, I encountered an error. Please try again.');
-                    console.error('Error:', error);
-                } finally {
-                    sendBtn.disabled = false;
-                    queryInput.disabled = false;
-                    queryInput.focus();
-                }
-            }
-
-            function sendExample(query) {
-                queryInput.value = query;
-                sendQuery();
-            }
-
-            function handleKeyPress(event) {
-                if (event.key === 'Enter') {
-                    sendQuery();
-                }
-            }
-
-            async function clearHistory() {
-                try {
-                    const response = await fetch('/api/clear-history', {
-                        method: 'POST',
-                    });
-
-                    if (response.ok) {
-                        chatContainer.innerHTML = '';
-                        addMessage('assistant', '<strong>History cleared!</strong><br>Start a new conversation by asking me anything about Malaysian food.');
-                    }
-                } catch (error) {
-                    console.error('Error:', error);
-                }
-            }
-
-            // Focus input on load
-            queryInput.focus();
-        </script>
-    </body>
-    </html>
-    """
+    return FileResponse(STATIC_DIR / "index.html")
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -521,8 +258,10 @@ async def query_agent(request: QueryRequest):
         raise HTTPException(status_code=503, detail="Agent not initialized")
 
     try:
-        # Run the agent query in the event loop
-        response = agent.query(request.query)
+        # Cache hits answer immediately; agent turns queue on the agent's lock
+        response = await agent.query_async(
+            request.query, verbose=False, session_id=request.session_id
+        )
 
         return QueryResponse(
             response=response,
@@ -532,23 +271,81 @@ async def query_agent(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
 
+@app.post("/api/query/batch", response_model=BatchResponse)
+async def query_agent_batch(request: BatchRequest):
+    """
+    Send several queries to the Malaysian Food Agent in one request.
+
+    Queries are independent: each is answered concurrently in its own
+    short-lived session (so it can use the response caches), and results
+    are returned in the order they were sent.
+    """
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+
+    gate = asyncio.Semaphore(BATCH_CONCURRENCY)
+    batch_id = uuid.uuid4().hex
+
+    async def answer(i: int, query: str) -> str:
+        session_id = f"{request.session_id}-batch-{batch_id}-{i}"
+        try:
+            async with gate:
+                return await agent.query_async(query, verbose=False, session_id=session_id)
+        finally:
+            agent.clear_history(session_id)
+
+    responses = await asyncio.gather(
+        *(answer(i, query) for i, query in enumerate(request.queries))
+    )
+
+    return BatchResponse(responses=[
+        QueryResponse(response=response, query=query)
+        for query, response in zip(request.queries, responses)
+    ])
+
+
+@app.post("/api/query/stream")
+async def stream_query_agent(request: QueryRequest):
+    """
+    Send a query to the Malaysian Food Agent and stream the response.
+
+    Returns Server-Sent Events: `{"delta": "..."}` for each text chunk,
+    followed by `{"done": true}` (or `{"error": "..."}` on failure).
+    """
+    if not agent:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+
+    def sse(payload: dict) -> bytes:
+        return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+    async def event_stream():
+        try:
+            async for delta in agent.stream_async(request.query, request.session_id):
+                yield sse({"delta": delta})
+            yield sse({"done": True})
+        except Exception as e:
+            yield sse({"error": f"Error processing query: {str(e)}"})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/clear-history")
-async def clear_conversation_history():
-    """Clear the conversation history."""
+async def clear_conversation_history(session_id: str = "default"):
+    """Clear the conversation history for a session."""
     if not agent:
         raise HTTPException(status_code=503, detail="Agent not initialized")
 
-    agent.clear_history()
+    agent.clear_history(session_id)
     return {"status": "success", "message": "Conversation history cleared"}
 
 
 @app.get("/api/history", response_model=HistoryResponse)
-async def get_conversation_history():
-    """Get the conversation history."""
+async def get_conversation_history(session_id: str = "default"):
+    """Get the conversation history for a session."""
     if not agent:
         raise HTTPException(status_code=503, detail="Agent not initialized")
 
-    return HistoryResponse(history=agent.get_history())
+    return HistoryResponse(history=agent.get_history(session_id))
 
 
 if __name__ == "__main__":
@@ -559,8 +356,13 @@ if __name__ == "__main__":
     print("API documentation at: http://localhost:8000/docs")
 
     uvicorn.run(
-        app,
+        "api:app",
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        # Sessions (agent context and history) are per process: more workers
+        # need sticky routing by session, or turns land on workers that lack them
+        workers=int(os.getenv("API_WORKERS", "1")),
+        loop="auto",  # uvloop when installed (uvicorn[standard])
+        http="auto",  # httptools when installed
+        log_level="warning",
     )
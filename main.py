@@ -2,16 +2,21 @@
 
 import os
 import sys
+import atexit
 import asyncio
+import functools
+import hashlib
+import threading
+import traceback
 from dotenv import load_dotenv
-from strands.models import BedrockModel
-from services.bedrock import BedrockService
-from services.mongodb import MongoDBFoodKnowledgeService
-from agent.malaysian_food_agent import MalaysianFoodAgent
+from utils.log import configure_logging
 
 # Load environment variables
 load_dotenv(override=True)
 
+# Log through a background thread so errors never block the event loop
+configure_logging()
+
 # ANSI color codes for better visibility
 class Colors:
     HEADER = '\033[95m'
@@ -25,18 +30,33 @@ class Colors:
     END = '\033[0m'
 
 
+# Rules built once rather than on every CLI turn
+_HEAVY_RULE = f"{Colors.BOLD}{Colors.CYAN}{'═' * 80}{Colors.END}"
+_LIGHT_RULE = f"{Colors.BLUE}{'─' * 80}{Colors.END}"
+_PROMPT_RULE = f"\n{Colors.BOLD}{Colors.BLUE}{'─' * 80}{Colors.END}"
+_PROMPT = f"{Colors.BOLD}You: {Colors.END}"
+
+# Inputs that end the interactive session
+_EXIT_CMDS = frozenset(('quit', 'exit', 'q', 'bye'))
+
+
+def write(text):
+    """Write a block of (multi-line) output with a single write and flush."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
 def print_header(text):
     """Print header with formatting."""
-    print(f"\n{Colors.BOLD}{Colors.CYAN}{'═' * 80}{Colors.END}")
-    print(f"{Colors.BOLD}{Colors.CYAN}{text}{Colors.END}")
-    print(f"{Colors.BOLD}{Colors.CYAN}{'═' * 80}{Colors.END}\n")
+    write(f"\n{_HEAVY_RULE}\n{Colors.BOLD}{Colors.CYAN}{text}{Colors.END}\n{_HEAVY_RULE}\n\n")
 
 
 def print_section(title, content="", color=Colors.YELLOW):
     """Print a section with title."""
-    print(f"\n{color}{Colors.BOLD}▶ {title}{Colors.END}")
+    text = f"\n{color}{Colors.BOLD}▶ {title}{Colors.END}\n"
     if content:
-        print(f"{color}{content}{Colors.END}")
+        text += f"{color}{content}{Colors.END}\n"
+    write(text)
 
 
 def print_thinking(text):
@@ -46,9 +66,10 @@ def print_thinking(text):
 
 def print_tool_call(tool_name, args=None):
     """Print tool call information."""
-    print(f"\n{Colors.CYAN}🔧 Tool Call: {Colors.BOLD}{tool_name}{Colors.END}")
+    text = f"\n{Colors.CYAN}🔧 Tool Call: {Colors.BOLD}{tool_name}{Colors.END}\n"
     if args:
-        print(f"{Colors.CYAN}   Parameters: {args}{Colors.END}")
+        text += f"{Colors.CYAN}   Parameters: {args}{Colors.END}\n"
+    write(text)
 
 
 def print_response(text):
@@ -63,7 +84,33 @@ def print_error(text):
 
 def print_separator():
     """Print separator line."""
-    print(f"{Colors.BLUE}{'─' * 80}{Colors.END}")
+    print(_LIGHT_RULE)
+
+
+async def read_input(prompt):
+    """
+    Read a line from stdin without blocking the event loop.
+
+    Reads on a daemon thread rather than the default executor, so an
+    unanswered prompt never holds up interpreter shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(setter, value):
+        if not future.done():
+            setter(value)
+
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(settle, future.set_result, line)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
 
 
 async def interactive_mode(agent):
@@ -78,25 +125,32 @@ async def interactive_mode(agent):
     """
     print_header("🍜 Malaysian Food Agent - Interactive Mode")
 
-    print(f"{Colors.GREEN}I'm your Malaysian food expert! I can help you with:{Colors.END}")
-    print(f"{Colors.GREEN}  • Information about Malaysian dishes and ingredients{Colors.END}")
-    print(f"{Colors.GREEN}  • Finding restaurants serving specific dishes{Colors.END}")
-    print(f"{Colors.GREEN}  • Dietary information (halal, vegetarian, etc.){Colors.END}")
-    print(f"{Colors.GREEN}  • Cultural significance and regional origins{Colors.END}")
-
-    print(f"\n{Colors.YELLOW}Type 'quit', 'exit', or press Ctrl+C to end the conversation.{Colors.END}")
-    print(f"{Colors.YELLOW}I'll show you my thought process as I work!{Colors.END}")
+    write(
+        f"{Colors.GREEN}I'm your Malaysian food expert! I can help you with:\n"
+        f"  • Information about Malaysian dishes and ingredients\n"
+        f"  • Finding restaurants serving specific dishes\n"
+        f"  • Dietary information (halal, vegetarian, etc.)\n"
+        f"  • Cultural significance and regional origins{Colors.END}\n"
+        f"\n{Colors.YELLOW}Type 'quit', 'exit', or press Ctrl+C to end the conversation.\n"
+        f"I'll show you my thought process as I work!{Colors.END}\n"
+    )
 
     conversation_count = 0
+    warm_hint = "Malaysian food"
+    warm_task = None
 
     while True:
         try:
+            # Warm connections while the user is typing
+            if warm_task is None or warm_task.done():
+                warm_task = asyncio.create_task(agent.warm_cache(warm_hint))
+
             # Get user input
-            print(f"\n{Colors.BOLD}{Colors.BLUE}{'─' * 80}{Colors.END}")
-            user_input = input(f"{Colors.BOLD}You: {Colors.END}").strip()
+            print(_PROMPT_RULE)
+            user_input = (await read_input(_PROMPT)).strip()
 
             # Check for exit commands
-            if user_input.lower() in ['quit', 'exit', 'q', 'bye']:
+            if user_input.lower() in _EXIT_CMDS:
                 print(f"\n{Colors.GREEN}Thank you for exploring Malaysian cuisine! Selamat makan! 🍜{Colors.END}")
                 break
 
@@ -105,6 +159,7 @@ async def interactive_mode(agent):
                 continue
 
             conversation_count += 1
+            warm_hint = user_input
             print_separator()
             print_section(f"Processing Query #{conversation_count}", color=Colors.CYAN)
 
@@ -126,78 +181,186 @@ async def interactive_mode(agent):
             break
         except Exception as e:
             print_error(f"An error occurred: {str(e)}")
-            import traceback
             traceback.print_exc()
 
 
+def fingerprint(*values):
+    """Hash settings (e.g. credentials) into a cache key that doesn't reveal them."""
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update((value or "").encode() + b"\0")
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def build_bedrock_service(region, embedding_model, inference_model, credentials_fingerprint):
+    """
+    Build the Bedrock service once per configuration (reused across reruns).
+
+    The AWS credentials are read here; the cache is keyed on their
+    fingerprint, so changed credentials rebuild the service without the
+    secret sitting in the cache key.
+    """
+    from services.bedrock import BedrockService
+
+    return BedrockService(
+        region=region,
+        embedding_model=embedding_model,
+        inference_model=inference_model,
+        access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def build_mongo_service(database, collection, uri_fingerprint, bedrock_config):
+    """
+    Build the MongoDB service once per configuration (reused across reruns).
+
+    The URI may embed a password, so it is read here and keyed on its
+    fingerprint; bedrock_config is build_bedrock_service's arguments.
+    """
+    from services.mongodb import MongoDBFoodKnowledgeService
+
+    return MongoDBFoodKnowledgeService(
+        uri=os.getenv("MONGODB_URI", "mongodb://localhost:27017"),
+        database=database,
+        collection=collection,
+        bedrock_service=build_bedrock_service(*bedrock_config),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def build_bedrock_model(model_id, region):
+    """Build the Strands BedrockModel once per configuration (reused across reruns)."""
+    from strands.models import BedrockModel
+    from agent.malaysian_food_agent import prompt_cache_options
+
+    return BedrockModel(
+        model_id=model_id,
+        region_name=region,
+        temperature=0.3,
+        # Cache the static system prompt (and tool specs, where the model supports it)
+        **prompt_cache_options(model_id),
+    )
+
+
+async def init_agent():
+    """
+    Build services and the agent, overlapping the blocking client setup.
+
+    Heavy dependencies (strands, boto3) are imported here rather than at
+    module level, so the banner prints before they load.
+
+    Returns:
+        Tuple of (agent, tavily_service)
+    """
+    bedrock_config = (
+        os.getenv("AWS_REGION", "us-east-1"),
+        os.getenv("BEDROCK_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0"),
+        os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0"),
+        fingerprint(os.getenv("AWS_ACCESS_KEY_ID"), os.getenv("AWS_SECRET_ACCESS_KEY")),
+    )
+
+    # Bedrock clients are independent, so build them concurrently
+    _, bedrock_model = await asyncio.gather(
+        asyncio.to_thread(build_bedrock_service, *bedrock_config),
+        asyncio.to_thread(
+            build_bedrock_model,
+            os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0"),
+            os.getenv("AWS_REGION", "us-east-1"),
+        ),
+    )
+    print(f"{Colors.GREEN}✓ AWS Bedrock service initialized{Colors.END}")
+    print(f"{Colors.GREEN}✓ Amazon Nova Pro model configured{Colors.END}")
+
+    # Initialize MongoDB service (Food Knowledge; needs the Bedrock service)
+    mongo_service = build_mongo_service(
+        os.getenv("MONGODB_DATABASE", "food_places_db"),
+        os.getenv("MONGODB_COLLECTION", "dishes"),
+        fingerprint(os.getenv("MONGODB_URI", "mongodb://localhost:27017")),
+        bedrock_config,
+    )
+    print(f"{Colors.GREEN}✓ MongoDB service initialized{Colors.END}")
+
+    from services.tavily import TavilyService
+    from agent.malaysian_food_agent import MalaysianFoodAgent
+
+    # Initialize Tavily service (Restaurant Finder)
+    tavily_service = TavilyService(api_key=os.getenv("TAVILY_API_KEY"))
+    print(f"{Colors.GREEN}✓ Tavily service initialized{Colors.END}")
+
+    # Create agent
+    agent = MalaysianFoodAgent(
+        mongo_service=mongo_service,
+        tavily_service=tavily_service,
+        model=bedrock_model
+    )
+
+    # Initialize agent (connects to MongoDB)
+    await asyncio.to_thread(agent.initialize)
+    write(
+        f"{Colors.GREEN}✓ Agent initialized with dual skills\n"
+        f"  - Food Knowledge Skill (MongoDB vector search)\n"
+        f"  - Restaurant Finder Skill (Tavily web search){Colors.END}\n"
+    )
+
+    return agent, tavily_service
+
+
+async def run_cli(agent, tavily_service):
+    """Run interactive mode, closing the HTTP sessions on the same event loop."""
+    try:
+        await interactive_mode(agent)
+    finally:
+        await agent.restaurant_finder_skill.close()
+        await tavily_service.close()
+
+
+def shutdown_agent(agent):
+    """Shut the agent down at interpreter exit (registered once it is built)."""
+    agent.shutdown()
+    print(f"\n{Colors.GREEN}✓ Agent shutdown complete{Colors.END}")
+
+
+def install_uvloop():
+    """Use uvloop's event loop when it is installed (it is unavailable on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def main():
     """Run the Malaysian Food Agent in interactive CLI mode."""
-    print(f"{Colors.BOLD}{Colors.HEADER}")
-    print("╔════════════════════════════════════════════════════════════════════════════╗")
-    print("║                     🍜 Malaysian Food Agent 🍜                             ║")
-    print("║                  Interactive CLI with Thought Process                      ║")
-    print("╚════════════════════════════════════════════════════════════════════════════╝")
-    print(Colors.END)
+    write(
+        f"{Colors.BOLD}{Colors.HEADER}\n"
+        "╔════════════════════════════════════════════════════════════════════════════╗\n"
+        "║                     🍜 Malaysian Food Agent 🍜                             ║\n"
+        "║                  Interactive CLI with Thought Process                      ║\n"
+        "╚════════════════════════════════════════════════════════════════════════════╝\n"
+        f"{Colors.END}\n"
+    )
 
     try:
         print(f"{Colors.YELLOW}Initializing services...{Colors.END}")
 
-        # Initialize Bedrock service (for embeddings)
-        bedrock_service = BedrockService(
-            region=os.getenv("AWS_REGION", "us-east-1"),
-            embedding_model=os.getenv("BEDROCK_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0"),
-            inference_model=os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0"),
-            access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        )
-        print(f"{Colors.GREEN}✓ AWS Bedrock service initialized{Colors.END}")
-
-        # Initialize MongoDB service (Food Knowledge)
-        mongo_service = MongoDBFoodKnowledgeService(
-            uri=os.getenv("MONGODB_URI", "mongodb://localhost:27017"),
-            database=os.getenv("MONGODB_DATABASE", "food_places_db"),
-            collection=os.getenv("MONGODB_COLLECTION", "dishes"),
-            bedrock_service=bedrock_service,
-        )
-        print(f"{Colors.GREEN}✓ MongoDB service initialized{Colors.END}")
-
-        # Create BedrockModel for Amazon Nova Pro
-        bedrock_model = BedrockModel(
-            model_id=os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0"),
-            region_name=os.getenv("AWS_REGION", "us-east-1"),
-            temperature=0.3,
-        )
-        print(f"{Colors.GREEN}✓ Amazon Nova Pro model configured{Colors.END}")
-
-        # Create agent
-        agent = MalaysianFoodAgent(
-            mongo_service=mongo_service,
-            model=bedrock_model
-        )
-
-        # Initialize agent
-        agent.initialize()
-        print(f"{Colors.GREEN}✓ Agent initialized with dual skills{Colors.END}")
-        print(f"{Colors.GREEN}  - Food Knowledge Skill (MongoDB vector search){Colors.END}")
-        print(f"{Colors.GREEN}  - Restaurant Finder Skill (Tavily web search){Colors.END}")
+        install_uvloop()
+
+        agent, tavily_service = asyncio.run(init_agent())
+        atexit.register(shutdown_agent, agent)
 
         # Run interactive mode
-        asyncio.run(interactive_mode(agent))
+        asyncio.run(run_cli(agent, tavily_service))
 
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}Interrupted by user.{Colors.END}")
         return 1
     except Exception as e:
         print_error(f"Failed to initialize: {str(e)}")
-        import traceback
         traceback.print_exc()
         return 1
-    finally:
-        try:
-            agent.shutdown()
-            print(f"\n{Colors.GREEN}✓ Agent shutdown complete{Colors.END}")
-        except:
-            pass
 
     return 0
 
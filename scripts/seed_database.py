@@ -1,10 +1,15 @@
 """Script to seed MongoDB with Malaysian dishes knowledge."""
 
 import os
+import asyncio
 from dotenv import load_dotenv
 from services.bedrock import BedrockService
+from services.embedding_cache import EmbeddingCache
 from services.mongodb import MongoDBFoodKnowledgeService
-from data.malaysian_dishes import MALAYSIAN_DISHES
+from services.response_cache import SemanticResponseCache
+from data.malaysian_dishes import (
+    MALAYSIAN_DISHES, DISH_EMBED_TEXT, CUISINE_COUNTS, CATEGORY_COUNTS,
+)
 
 # Load environment variables
 load_dotenv(override=True)
@@ -21,6 +26,8 @@ def main():
         inference_model=os.getenv("BEDROCK_INFERENCE_MODEL", "amazon.nova-pro-v1:0"),
         access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
         secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        # Reseeding only embeds dishes whose text changed
+        embedding_cache=EmbeddingCache(os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")),
     )
 
     # Initialize MongoDB service
@@ -39,25 +46,37 @@ def main():
         print("Clearing existing dishes...")
         mongo_service.clear_all_dishes()
 
-        # Insert dishes with embeddings
+        # Embed dishes concurrently, inserting batches as embeddings arrive
         print(f"\nInserting {len(MALAYSIAN_DISHES)} Malaysian dishes...\n")
-        mongo_service.insert_dishes(MALAYSIAN_DISHES)
+        asyncio.run(mongo_service.insert_dishes_async(MALAYSIAN_DISHES, texts=DISH_EMBED_TEXT))
+
+        # Verify what the server stored before building indexes over it
+        stored = mongo_service.collection.count_documents({})
+        if stored < len(MALAYSIAN_DISHES):
+            print(f"\n✗ Only {stored} of {len(MALAYSIAN_DISHES)} dishes were stored")
+            return 1
 
         print("\n✓ Database seeded successfully!")
-        print(f"\nTotal dishes inserted: {len(MALAYSIAN_DISHES)}")
+        print(f"\nTotal dishes stored: {stored}")
 
         # Display summary
-        cuisine_types = list(set(d["cuisine_type"] for d in MALAYSIAN_DISHES))
-        categories = list(set(d["category"] for d in MALAYSIAN_DISHES))
-
-        print(f"\nCuisine types: {', '.join(cuisine_types)}")
-        print(f"Categories: {', '.join(categories)}")
+        print(f"\nCuisine types: {', '.join(f'{name} ({count})' for name, count in sorted(CUISINE_COUNTS.items()))}")
+        print(f"Categories: {', '.join(f'{name} ({count})' for name, count in sorted(CATEGORY_COUNTS.items()))}")
 
         # Create vector search index programmatically
         print("\n" + "=" * 80)
         print("Creating Vector Search Index...")
         print("=" * 80)
         mongo_service.create_vector_search_index()
+
+        # Response cache index (used by the API's semantic response cache)
+        response_cache = SemanticResponseCache(
+            mongo_service=mongo_service,
+            collection=os.getenv("RESPONSE_CACHE_COLLECTION", "response_cache"),
+        )
+        response_cache.connect()
+        response_cache.clear()
+        response_cache.create_vector_search_index()
         print("=" * 80)
 
     except Exception as e:
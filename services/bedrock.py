@@ -1,9 +1,37 @@
 """AWS Bedrock service for embeddings and inference using Amazon models."""
 
-import json
-from typing import List, Optional
+import asyncio
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
 import boto3
+import orjson
 from botocore.config import Config
+from services.embedding_cache import EmbeddingCache, embedding_key
+
+
+def normalize(embedding: List[float]) -> List[float]:
+    """
+    Scale an embedding to unit length.
+
+    Unit vectors let vector indexes use dotProduct, which equals cosine
+    similarity without renormalizing on every comparison.
+
+    Args:
+        embedding: Embedding values
+
+    Returns:
+        L2-normalized embedding
+    """
+    norm = math.hypot(*embedding)
+    if not norm:
+        return embedding
+    scale = 1.0 / norm
+    return [value * scale for value in embedding]
 
 
 class BedrockService:
@@ -16,6 +44,10 @@ class BedrockService:
         inference_model: str,
         access_key_id: Optional[str] = None,
         secret_access_key: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        max_pool_connections: int = 16,
+        memo_size: int = 4096,
+        memo_ttl: float = 24 * 3600,
     ):
         """
         Initialize Bedrock service.
@@ -26,8 +58,19 @@ class BedrockService:
             inference_model: Model ID for inference (e.g., amazon.nova-pro-v1:0)
             access_key_id: AWS access key ID (optional, uses default credentials if not provided)
             secret_access_key: AWS secret access key (optional)
+            embedding_cache: Optional on-disk cache so unchanged texts skip Bedrock
+            max_pool_connections: HTTP connections kept by the client; keep at least
+                as wide as the embedding concurrency so requests don't queue
+            memo_size: Maximum embeddings kept in the in-memory LRU
+            memo_ttl: Seconds an in-memory embedding stays valid
         """
-        config = Config(region_name=region)
+        config = Config(
+            region_name=region,
+            max_pool_connections=max_pool_connections,
+            # Adaptive mode backs off client-side on ThrottlingException, so
+            # concurrent bulk embedding slows down instead of failing
+            retries={"max_attempts": 10, "mode": "adaptive"},
+        )
 
         if access_key_id and secret_access_key:
             self.client = boto3.client(
@@ -39,8 +82,16 @@ class BedrockService:
         else:
             self.client = boto3.client("bedrock-runtime", config=config)
 
+        self.max_pool_connections = max_pool_connections
         self.embedding_model = embedding_model
         self.inference_model = inference_model
+        self.embedding_cache = embedding_cache
+
+        # In-memory LRU of recent embeddings: key -> (expiry, packed float32)
+        self.memo_size = memo_size
+        self.memo_ttl = memo_ttl
+        self._memo: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._memo_lock = threading.Lock()
 
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -52,6 +103,17 @@ class BedrockService:
         Returns:
             List of embedding values
         """
+        key = embedding_key(self.embedding_model, text)
+        cached = self._memo_get(key)
+        if cached is not None:
+            return cached
+
+        if self.embedding_cache:
+            cached = self.embedding_cache.get(self.embedding_model, text)
+            if cached is not None:
+                self._memo_put(key, cached)
+                return cached
+
         try:
             payload = {"inputText": text}
 
@@ -59,32 +121,140 @@ class BedrockService:
                 modelId=self.embedding_model,
                 contentType="application/json",
                 accept="application/json",
-                body=json.dumps(payload),
+                body=orjson.dumps(payload),
             )
 
-            response_body = json.loads(response["body"].read())
-            return response_body["embedding"]
+            response_body = orjson.loads(response["body"].read())
+            embedding = normalize(response_body["embedding"])
+
+            self._memo_put(key, embedding)
+            if self.embedding_cache:
+                self.embedding_cache.put(self.embedding_model, text, embedding)
+            return embedding
 
         except Exception as e:
             print(f"Error generating embedding: {e}")
             raise
 
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def _memo_get(self, key: bytes) -> Optional[List[float]]:
+        """Get an unexpired embedding from the in-memory LRU."""
+        with self._memo_lock:
+            entry = self._memo.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._memo[key]
+                return None
+            self._memo.move_to_end(key)
+        return array("f", entry[1]).tolist()
+
+    def _memo_put(self, key: bytes, embedding: List[float]) -> None:
+        """Store an embedding in the in-memory LRU as packed float32."""
+        self._memo_store(key, array("f", embedding).tobytes())
+
+    def _memo_store(self, key: bytes, vector: bytes) -> None:
+        """Store a packed vector in the in-memory LRU, evicting the oldest entry."""
+        with self._memo_lock:
+            self._memo[key] = (time.monotonic() + self.memo_ttl, vector)
+            self._memo.move_to_end(key)
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def preload_embeddings(self, entries: Iterable[Tuple[bytes, bytes]]) -> None:
+        """
+        Warm the in-memory LRU from previously stored embeddings.
+
+        Args:
+            entries: (key, packed float32 vector) pairs, most recent first
+        """
+        for key, vector in reversed(list(entries)):
+            self._memo_store(key, vector)
+
+    def generate_embeddings(self, texts: List[str], max_workers: int = 8) -> List[List[float]]:
         """
         Generate embeddings for multiple texts.
 
+        Runs generate_embeddings_async, on a private loop in a worker thread
+        when the caller is already inside a running event loop.
+
         Args:
             texts: List of input texts
+            max_workers: Maximum concurrent Bedrock requests
 
         Returns:
-            List of embeddings
+            List of embeddings (same order as texts)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.generate_embeddings_async(texts, max_workers))
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(
+                asyncio.run, self.generate_embeddings_async(texts, max_workers)
+            ).result()
+
+    async def generate_embeddings_async(
+        self, texts: Sequence[str], max_concurrency: Optional[int] = None
+    ) -> List[List[float]]:
         """
-        embeddings = []
-        for text in texts:
-            embedding = self.generate_embedding(text)
-            embeddings.append(embedding)
+        Generate embeddings for multiple texts from async code.
+
+        Args:
+            texts: Input texts
+            max_concurrency: Maximum concurrent Bedrock requests (defaults to
+                the client's connection pool size)
+
+        Returns:
+            List of embeddings (same order as texts)
+        """
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        async for i, embedding in self.iter_embeddings_async(texts, max_concurrency):
+            embeddings[i] = embedding
         return embeddings
 
+    async def iter_embeddings_async(
+        self, texts: Sequence[str], max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, List[float]]]:
+        """
+        Generate embeddings for multiple texts, yielding each as it arrives.
+
+        Identical texts are embedded once, and texts already in the in-memory
+        cache are answered on the event loop. Only the remaining requests run
+        on worker threads, with a semaphore capping how many are in flight.
+        If a request fails, the pending ones are cancelled.
+
+        Args:
+            texts: Input texts
+            max_concurrency: Maximum concurrent Bedrock requests (defaults to
+                the client's connection pool size)
+
+        Yields:
+            (index into texts, embedding) pairs, in completion order
+        """
+        gate = asyncio.Semaphore(max_concurrency or self.max_pool_connections)
+
+        async def embed(text: str) -> Tuple[str, List[float]]:
+            cached = self._memo_get(embedding_key(self.embedding_model, text))
+            if cached is not None:
+                return text, cached
+            async with gate:
+                return text, await asyncio.to_thread(self.generate_embedding, text)
+
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(text, []).append(i)
+
+        tasks = [asyncio.create_task(embed(text)) for text in positions]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                text, embedding = await next_done
+                for i in positions[text]:
+                    yield i, embedding
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     def generate_completion(
         self,
         prompt: str,
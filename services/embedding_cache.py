@@ -0,0 +1,169 @@
+"""Embedding caches keyed by a hash of the embedded text."""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from bson.binary import Binary
+from pymongo.collection import Collection
+
+if TYPE_CHECKING:
+    from services.mongodb import MongoDBFoodKnowledgeService
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    """Hash the model ID and text into a cache key."""
+    return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+
+class EmbeddingCache:
+    """Persist embeddings in SQLite so unchanged texts are never re-embedded."""
+
+    def __init__(self, path: str = ".cache/embeddings.sqlite3"):
+        """
+        Initialize embedding cache.
+
+        Args:
+            path: SQLite database file (parent directories are created)
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model: Embedding model ID
+            text: Embedded text
+
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (embedding_key(model, text),)
+            ).fetchone()
+        if row is None:
+            return None
+        return array("f", row[0]).tolist()
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        """
+        Store an embedding as packed float32.
+
+        Args:
+            model: Embedding model ID
+            text: Embedded text
+            embedding: Embedding values
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                (embedding_key(model, text), array("f", embedding).tobytes()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class MongoEmbeddingCache:
+    """Share embeddings across processes in a MongoDB collection with a TTL."""
+
+    def __init__(
+        self,
+        mongo_service: "MongoDBFoodKnowledgeService",
+        collection: str = "embedding_cache",
+        ttl_seconds: int = 24 * 3600,
+    ):
+        """
+        Initialize MongoDB embedding cache.
+
+        Args:
+            mongo_service: MongoDB service (its database is reused)
+            collection: Collection name for cached embeddings
+            ttl_seconds: How long embeddings live before MongoDB expires them
+        """
+        self.mongo_service = mongo_service
+        self.collection_name = collection
+        self.ttl_seconds = ttl_seconds
+        self.collection: Optional[Collection] = None
+
+    def connect(self) -> None:
+        """Bind the cache collection and ensure its TTL index exists."""
+        self.collection = self.mongo_service.db[self.collection_name]
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model: Embedding model ID
+            text: Embedded text
+
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        if self.collection is None:
+            return None
+
+        try:
+            doc = self.collection.find_one({"_id": embedding_key(model, text)}, {"vector": 1})
+        except Exception as e:
+            print(f"Embedding cache lookup failed: {e}")
+            return None
+        if doc is None:
+            return None
+        return array("f", doc["vector"]).tolist()
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        """
+        Store an embedding as packed float32.
+
+        Args:
+            model: Embedding model ID
+            text: Embedded text
+            embedding: Embedding values
+        """
+        if self.collection is None:
+            return
+
+        try:
+            self.collection.update_one(
+                {"_id": embedding_key(model, text)},
+                {"$set": {
+                    "vector": Binary(array("f", embedding).tobytes()),
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"Embedding cache store failed: {e}")
+
+    def recent(self, limit: int) -> List[Tuple[bytes, bytes]]:
+        """
+        Get the most recently stored embeddings, for warming an in-memory cache.
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            List of (key, packed float32 vector) pairs
+        """
+        if self.collection is None:
+            return []
+
+        cursor = self.collection.find({}, {"vector": 1}).sort("expires_at", -1).limit(limit)
+        return [(bytes(doc["_id"]), bytes(doc["vector"])) for doc in cursor]
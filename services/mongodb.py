@@ -1,11 +1,23 @@
 """MongoDB vector search service for Malaysian food knowledge."""
 
-from typing import List, Optional, Dict, Any
+import asyncio
+import hashlib
+import heapq
+import operator
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import orjson
+from bson.binary import Binary, BinaryVectorDtype
 from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
 from pydantic import BaseModel
 from services.bedrock import BedrockService
+from data.malaysian_dishes import dish_embedding_text
 
 
 class MalaysianDish(BaseModel):
@@ -18,11 +30,92 @@ class MalaysianDish(BaseModel):
     cooking_method: Optional[str] = None
     taste_profile: List[str]  # Sweet, Spicy, Savory, Sour, Umami
     dietary_info: Dict[str, bool]  # halal, vegetarian, vegan, gluten_free
+    dietary_flags: int = 0  # Bitmask: 1 halal, 2 vegetarian, 4 vegan, 8 gluten_free
     cultural_significance: Optional[str] = None
     typical_meal_time: List[str]  # Breakfast, Lunch, Dinner, Snack, Anytime
     regional_origin: Optional[str] = None  # Which state/region it's from
     common_pairings: List[str]  # What it's usually served with
     embedding: Optional[List[float]] = None
+    content_hash: Optional[str] = None  # SHA-256 of the content, set on insert
+
+
+def pack_embedding(embedding: List[float]) -> Binary:
+    """
+    Pack an embedding as a BSON float32 vector.
+
+    Stored as 4 bytes per dimension instead of an array of 8-byte doubles.
+
+    Args:
+        embedding: Embedding values
+
+    Returns:
+        BSON binary vector (subtype 9)
+    """
+    return Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32)
+
+
+# Dish fields returned by vector search (never the embedding)
+_RESULT_FIELDS = (
+    "name",
+    "cuisine_type",
+    "category",
+    "description",
+    "ingredients",
+    "cooking_method",
+    "taste_profile",
+    "dietary_info",
+    "cultural_significance",
+    "typical_meal_time",
+    "regional_origin",
+    "common_pairings",
+)
+
+
+def unpack_embedding(value: Any) -> array:
+    """
+    Unpack a stored embedding into a float32 array.
+
+    Args:
+        value: BSON float32 vector (2-byte header) or legacy list of floats
+
+    Returns:
+        Embedding values
+    """
+    if isinstance(value, (bytes, Binary)):
+        return array("f", bytes(value)[2:])
+    return array("f", value)
+
+
+def quantize_int8(vector: Sequence[float]) -> Tuple[array, float]:
+    """
+    Quantize a vector to int8 with a per-vector scale.
+
+    Args:
+        vector: Embedding values
+
+    Returns:
+        (int8 values, scale) where value * scale approximates the original
+    """
+    scale = max(map(abs, vector), default=0.0) / 127.0 or 1.0
+    return array("b", [round(v / scale) for v in vector]), scale
+
+
+# Fields added on insert, excluded from a dish's content hash
+_DERIVED_FIELDS = frozenset(("_id", "embedding", "content_hash"))
+
+
+def content_hash(dish: Dict[str, Any]) -> str:
+    """
+    Hash a dish's content, ignoring fields added on insert.
+
+    Args:
+        dish: Dish data
+
+    Returns:
+        Hex SHA-256 of the dish serialized with sorted keys
+    """
+    content = {k: v for k, v in dish.items() if k not in _DERIVED_FIELDS}
+    return hashlib.sha256(orjson.dumps(content, option=orjson.OPT_SORT_KEYS)).hexdigest()
 
 
 class MongoDBFoodKnowledgeService:
@@ -34,6 +127,14 @@ class MongoDBFoodKnowledgeService:
         database: str,
         collection: str,
         bedrock_service: BedrockService,
+        max_pool_size: int = 50,
+        min_pool_size: int = 5,
+        search_cache_size: int = 256,
+        search_cache_ttl: float = 60.0,
+        quantization: Optional[str] = "scalar",
+        local_search_limit: int = 500,
+        local_int8: bool = False,
+        local_index_ttl: float = 60.0,
     ):
         """
         Initialize MongoDB food knowledge service.
@@ -43,6 +144,17 @@ class MongoDBFoodKnowledgeService:
             database: Database name
             collection: Collection name (e.g., 'dishes')
             bedrock_service: BedrockService instance for embeddings
+            max_pool_size: Maximum connections in the client pool
+            min_pool_size: Connections kept open while idle
+            search_cache_size: Maximum vector search results kept in memory
+            search_cache_ttl: Seconds a cached vector search result stays valid
+            quantization: Vector index quantization ('scalar', 'binary' or None for full fidelity)
+            local_search_limit: Search in-process when the collection has at most this
+                many dishes (0 always uses Atlas $vectorSearch)
+            local_int8: Keep in-process embeddings as int8: a quarter of the memory,
+                but no faster in pure Python and slightly different rankings
+            local_index_ttl: Seconds before the in-process index is reloaded, so
+                reseeding from another process is picked up
         """
         self.client: Optional[MongoClient] = None
         self.db: Optional[Database] = None
@@ -51,22 +163,60 @@ class MongoDBFoodKnowledgeService:
         self.database_name = database
         self.collection_name = collection
         self.bedrock_service = bedrock_service
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.quantization = quantization
+
+        # Recent vector search results: key -> (expiry, results)
+        self.search_cache_size = search_cache_size
+        self.search_cache_ttl = search_cache_ttl
+        self._search_cache: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._search_lock = threading.Lock()
+
+        # In-memory (embedding, scale, dish) for small collections; None until loaded
+        self.local_search_limit = local_search_limit
+        self.local_int8 = local_int8
+        self.local_index_ttl = local_index_ttl
+        self._local_index: Optional[List[Tuple[array, float, Dict[str, Any]]]] = None
+        self._local_expiry = 0.0  # Reload when time.monotonic() passes this
+        self._local_lock = threading.Lock()
 
     def connect(self) -> None:
-        """Connect to MongoDB."""
-        self.client = MongoClient(self.uri)
+        """Connect to MongoDB (one pooled client shared by all requests)."""
+        if self.client:
+            return
+
+        self.client = MongoClient(
+            self.uri,
+            maxPoolSize=self.max_pool_size,
+            minPoolSize=self.min_pool_size,
+            maxIdleTimeMS=30000,
+            serverSelectionTimeoutMS=3000,
+            socketTimeoutMS=15000,
+            retryReads=True,
+            # Compress text-heavy results (zstd via pymongo[zstd]; zlib is built in)
+            compressors="zstd,zlib",
+            appname="malaysian-food-agent",
+        )
         self.db = self.client[self.database_name]
         self.collection = self.db[self.collection_name]
+
+        # Open the first pooled connection now rather than on the first query
+        self.client.admin.command("ping")
         print("Connected to MongoDB")
 
     def disconnect(self) -> None:
         """Disconnect from MongoDB."""
         if self.client:
             self.client.close()
+            self.client = None
             print("Disconnected from MongoDB")
 
     def create_vector_search_index(self) -> None:
         """Create vector search index programmatically."""
+        # Regular index used to skip re-inserting unchanged dishes
+        self.collection.create_index("content_hash", unique=True, sparse=True)
+
         try:
             index_definition = {
                 "name": "food_vector_index",
@@ -77,7 +227,7 @@ class MongoDBFoodKnowledgeService:
                             "type": "vector",
                             "path": "embedding",
                             "numDimensions": 1024,
-                            "similarity": "cosine"
+                            "similarity": "dotProduct"
                         },
                         {
                             "type": "filter",
@@ -99,6 +249,9 @@ class MongoDBFoodKnowledgeService:
                 }
             }
 
+            if self.quantization:
+                index_definition["definition"]["fields"][0]["quantization"] = self.quantization
+
             # Create the search index using createSearchIndexes command
             result = self.collection.create_search_index(index_definition)
             print(f"✓ Vector search index created successfully: {result}")
@@ -134,7 +287,8 @@ class MongoDBFoodKnowledgeService:
               "type": "vector",
               "path": "embedding",
               "numDimensions": 1024,
-              "similarity": "cosine"
+              "similarity": "dotProduct",
+              "quantization": "scalar"
             },
             {
               "type": "filter",
@@ -180,6 +334,13 @@ class MongoDBFoodKnowledgeService:
             dish_data: Dish data dictionary
         """
         try:
+            # Unchanged dishes are already stored with their embedding
+            dish_hash = content_hash(dish_data)
+            if self.collection.find_one({"content_hash": dish_hash}, {"_id": 1}):
+                print(f"Unchanged dish: {dish_data['name']}")
+                return
+            dish_data["content_hash"] = dish_hash
+
             # Create text representation for embedding
             text_for_embedding = self._create_text_representation(dish_data)
 
@@ -187,31 +348,180 @@ class MongoDBFoodKnowledgeService:
             embedding = self.bedrock_service.generate_embedding(text_for_embedding)
 
             # Add embedding to dish data
-            dish_data["embedding"] = embedding
+            dish_data["embedding"] = pack_embedding(embedding)
 
             # Insert into MongoDB
             self.collection.insert_one(dish_data)
+            self.invalidate()
             print(f"Inserted dish: {dish_data['name']}")
 
         except Exception as e:
             print(f"Error inserting dish: {e}")
             raise
 
-    def insert_dishes(self, dishes: List[Dict[str, Any]]) -> None:
+    def insert_dishes(
+        self,
+        dishes: List[Dict[str, Any]],
+        embeddings: Optional[Sequence[List[float]]] = None,
+        max_workers: int = 8,
+    ) -> None:
         """
         Insert multiple Malaysian dishes with embeddings.
 
+        Embeddings are generated concurrently and all dishes are written in
+        a single unordered bulk insert; per-dish write errors are reported
+        without aborting the rest of the batch. Dishes whose content hash is
+        already stored are skipped.
+
         Args:
             dishes: List of dish data dictionaries
+            embeddings: Precomputed embeddings, one per dish (generated if omitted)
+            max_workers: Concurrent embedding requests, capped by the Bedrock connection pool
         """
-        for dish in dishes:
-            self.insert_dish(dish)
+        if not dishes:
+            return
+
+        try:
+            keep = self._new_dish_indices(dishes)
+            if not keep:
+                return
+            dishes = [dishes[i] for i in keep]
+
+            if embeddings is None:
+                texts = [self._create_text_representation(dish) for dish in dishes]
+                embeddings = self.bedrock_service.generate_embeddings(
+                    texts, max_workers=min(max_workers, self.bedrock_service.max_pool_connections)
+                )
+            else:
+                embeddings = [embeddings[i] for i in keep]
+
+            for dish, embedding in zip(dishes, embeddings):
+                dish["embedding"] = pack_embedding(embedding)
+
+            inserted = self._insert_batch(dishes)
+            self.invalidate()
+            print(f"Inserted {inserted} of {len(dishes)} dishes")
+
+        except Exception as e:
+            print(f"Error inserting dishes: {e}")
+            raise
+
+    async def insert_dishes_async(
+        self,
+        dishes: List[Dict[str, Any]],
+        texts: Optional[Sequence[str]] = None,
+        batch_size: int = 500,
+        max_concurrency: int = 16,
+    ) -> None:
+        """
+        Insert multiple Malaysian dishes, overlapping embedding with inserts.
+
+        Embedding requests run concurrently; each dish is queued as soon as
+        its embedding arrives, and a writer inserts whatever is queued in
+        unordered batches while the remaining dishes are still being embedded.
+
+        Args:
+            dishes: List of dish data dictionaries
+            texts: Precomputed embedding texts, one per dish (built if omitted)
+            batch_size: Maximum dishes per insert_many
+            max_concurrency: Maximum concurrent Bedrock requests
+        """
+        if not dishes:
+            return
+
+        keep = await asyncio.to_thread(self._new_dish_indices, dishes)
+        if not keep:
+            return
+        if texts is None:
+            texts = [self._create_text_representation(dish) for dish in dishes]
+
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+        async def embed() -> None:
+            pending = [texts[i] for i in keep]
+            async for j, embedding in self.bedrock_service.iter_embeddings_async(
+                pending, max_concurrency
+            ):
+                dish = dishes[keep[j]]
+                dish["embedding"] = pack_embedding(embedding)
+                await queue.put(dish)
+
+        async def write() -> int:
+            inserted = 0
+            done = False
+            while not done:
+                # Wait for one dish, then take whatever else is already queued
+                batch = []
+                dish = await queue.get()
+                while True:
+                    if dish is None:
+                        done = True
+                        break
+                    batch.append(dish)
+                    if len(batch) >= batch_size or queue.empty():
+                        break
+                    dish = queue.get_nowait()
+                if batch:
+                    inserted += await asyncio.to_thread(self._insert_batch, batch)
+            return inserted
+
+        writer = asyncio.create_task(write())
+        try:
+            # Pending embeds are cancelled on the first failure, and all have
+            # settled before the writer's sentinel is queued
+            await embed()
+        finally:
+            await queue.put(None)
+            inserted = await writer
+            self.invalidate()
+        print(f"Inserted {inserted} of {len(keep)} dishes")
+
+    def _new_dish_indices(self, dishes: List[Dict[str, Any]]) -> List[int]:
+        """
+        Stamp content hashes and find the dishes not already stored.
+
+        Returns:
+            Indices of dishes whose content hash is not in the collection
+        """
+        hashes = [content_hash(dish) for dish in dishes]
+        stored = {
+            doc["content_hash"]
+            for doc in self.collection.find(
+                {"content_hash": {"$in": hashes}}, {"content_hash": 1, "_id": 0}
+            )
+        }
+        if stored:
+            print(f"Skipping {len(stored)} unchanged dishes")
+
+        keep = []
+        for i, (dish, dish_hash) in enumerate(zip(dishes, hashes)):
+            if dish_hash not in stored:
+                dish["content_hash"] = dish_hash
+                keep.append(i)
+        return keep
+
+    def _insert_batch(self, dishes: List[Dict[str, Any]]) -> int:
+        """
+        Insert dishes in one unordered bulk write, reporting per-dish failures.
+
+        Returns:
+            Number of dishes inserted
+        """
+        try:
+            self.collection.insert_many(dishes, ordered=False)
+            return len(dishes)
+        except BulkWriteError as e:
+            # Unordered: every other dish was still written, so report and carry on
+            for error in e.details.get("writeErrors", []):
+                print(f"Error inserting dish '{dishes[error['index']].get('name')}': {error['errmsg']}")
+            return e.details.get("nInserted", 0)
 
     def vector_search(
         self,
         query: str,
         limit: int = 5,
         filters: Optional[Dict[str, Any]] = None,
+        fields: Sequence[str] = _RESULT_FIELDS,
     ) -> List[Dict[str, Any]]:
         """
         Perform vector search for Malaysian dishes/food.
@@ -220,75 +530,234 @@ class MongoDBFoodKnowledgeService:
             query: Search query
             limit: Maximum number of results
             filters: Optional filters (cuisine_type, category, dietary restrictions)
+            fields: Dish fields to return, alongside relevance_score
 
         Returns:
-            List of matching dishes
+            List of matching dishes, ready to serialize as tool output
         """
+        # Tools often repeat a search within one agent turn (e.g. ingredients
+        # then dietary info for the same dish), so reuse recent results
+        key = (query, limit, tuple(sorted((filters or {}).items())), tuple(fields))
+        with self._search_lock:
+            entry = self._search_cache.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._search_cache.move_to_end(key)
+                return [dict(doc) for doc in entry[1]]
+
         try:
-            # Generate embedding for query
-            query_embedding = self.bedrock_service.generate_embedding(query)
-
-            # Build filter conditions
-            filter_conditions = []
-            if filters:
-                if "cuisine_type" in filters and filters["cuisine_type"]:
-                    filter_conditions.append({"cuisine_type": {"$eq": filters["cuisine_type"]}})
-                if "category" in filters and filters["category"]:
-                    filter_conditions.append({"category": {"$eq": filters["category"]}})
-                if "halal" in filters and filters["halal"] is not None:
-                    filter_conditions.append({"dietary_info.halal": {"$eq": filters["halal"]}})
-                if "vegetarian" in filters and filters["vegetarian"] is not None:
-                    filter_conditions.append({"dietary_info.vegetarian": {"$eq": filters["vegetarian"]}})
-
-            # Build aggregation pipeline
-            pipeline = [
-                {
-                    "$vectorSearch": {
-                        "index": "food_vector_index",
-                        "path": "embedding",
-                        "queryVector": query_embedding,
-                        "numCandidates": limit * 10,
-                        "limit": limit,
-                    }
-                },
-                {
-                    "$project": {
-                        "_id": 1,
-                        "name": 1,
-                        "cuisine_type": 1,
-                        "category": 1,
-                        "description": 1,
-                        "ingredients": 1,
-                        "cooking_method": 1,
-                        "taste_profile": 1,
-                        "dietary_info": 1,
-                        "cultural_significance": 1,
-                        "typical_meal_time": 1,
-                        "regional_origin": 1,
-                        "common_pairings": 1,
-                        "score": {"$meta": "vectorSearchScore"},
-                    }
-                },
-            ]
-
-            # Add filter if conditions exist
-            if filter_conditions:
-                pipeline[0]["$vectorSearch"]["filter"] = {"$and": filter_conditions}
-
-            results = list(self.collection.aggregate(pipeline))
-            return results
+            local_index = self._get_local_index()
+            if local_index is not None:
+                results = self._local_search(local_index, query, limit, filters, fields)
+            else:
+                results = list(self.iter_vector_search(query, limit, filters, fields))
+
+            with self._search_lock:
+                self._search_cache[key] = (time.monotonic() + self.search_cache_ttl, results)
+                self._search_cache.move_to_end(key)
+                if len(self._search_cache) > self.search_cache_size:
+                    self._search_cache.popitem(last=False)
+
+            return [dict(doc) for doc in results]
 
         except Exception as e:
             print(f"Error performing vector search: {e}")
             raise
 
+    def iter_vector_search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Sequence[str] = _RESULT_FIELDS,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream vector search results straight from the cursor, bypassing the cache.
+
+        Documents are decoded batch by batch, so callers that stop early (or
+        only want the first hit) never materialize the rest.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            filters: Optional filters (cuisine_type, category, dietary restrictions)
+            fields: Dish fields to return, alongside relevance_score
+
+        Returns:
+            Iterator over matching dishes
+        """
+        return self.collection.aggregate(
+            self._vector_search_pipeline(query, limit, filters, fields)
+        )
+
+    def _vector_search_pipeline(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        fields: Sequence[str],
+    ) -> List[Dict[str, Any]]:
+        """Build the $vectorSearch aggregation pipeline for a query."""
+        # Generate embedding for query
+        query_embedding = self.bedrock_service.generate_embedding(query)
+
+        # Build filter conditions
+        filter_conditions = []
+        if filters:
+            if "cuisine_type" in filters and filters["cuisine_type"]:
+                filter_conditions.append({"cuisine_type": {"$eq": filters["cuisine_type"]}})
+            if "category" in filters and filters["category"]:
+                filter_conditions.append({"category": {"$eq": filters["category"]}})
+            if "halal" in filters and filters["halal"] is not None:
+                filter_conditions.append({"dietary_info.halal": {"$eq": filters["halal"]}})
+            if "vegetarian" in filters and filters["vegetarian"] is not None:
+                filter_conditions.append({"dietary_info.vegetarian": {"$eq": filters["vegetarian"]}})
+
+        # Build aggregation pipeline
+        pipeline = [
+            {
+                "$vectorSearch": {
+                    "index": "food_vector_index",
+                    "path": "embedding",
+                    "queryVector": pack_embedding(query_embedding),
+                    # Extra candidates make up for quantization recall loss
+                    "numCandidates": max(limit * 20, 200),
+                    "limit": limit,
+                }
+            },
+            {
+                # Inclusion projection: the embedding and _id never leave the server
+                "$project": {
+                    "_id": 0,
+                    **dict.fromkeys(fields, 1),
+                    # Named as the tools report it, so results pass straight through
+                    "relevance_score": {"$meta": "vectorSearchScore"},
+                }
+            },
+        ]
+
+        # Add filter if conditions exist
+        if filter_conditions:
+            pipeline[0]["$vectorSearch"]["filter"] = {"$and": filter_conditions}
+
+        return pipeline
+
+    def _get_local_index(self) -> Optional[List[Tuple[array, float, Dict[str, Any]]]]:
+        """
+        Load every dish embedding into memory if the collection is small enough.
+
+        A brute-force scan of a few hundred vectors is cheaper than an Atlas
+        round trip; larger collections keep using $vectorSearch.
+
+        Returns:
+            (embedding, scale, dish) entries, or None to search in Atlas
+        """
+        if self.local_search_limit <= 0:
+            return None
+
+        with self._local_lock:
+            if time.monotonic() >= self._local_expiry:
+                self._local_index = None
+                if self.collection.estimated_document_count() <= self.local_search_limit:
+                    projection = {"_id": 0, "embedding": 1, **dict.fromkeys(_RESULT_FIELDS, 1)}
+                    index = []
+                    for doc in self.collection.find({"embedding": {"$exists": True}}, projection):
+                        vector = unpack_embedding(doc.pop("embedding"))
+                        if self.local_int8:
+                            index.append((*quantize_int8(vector), doc))
+                        else:
+                            index.append((vector, 1.0, doc))
+                    self._local_index = index
+                self._local_expiry = time.monotonic() + self.local_index_ttl
+            return self._local_index
+
+    def _local_search(
+        self,
+        local_index: List[Tuple[array, float, Dict[str, Any]]],
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        fields: Sequence[str],
+    ) -> List[Dict[str, Any]]:
+        """Score dishes in memory the way Atlas scores dotProduct vector search."""
+        query_vector, query_scale = self._local_query_vector(
+            self.bedrock_service.generate_embedding(query)
+        )
+
+        conditions = []
+        if filters:
+            if filters.get("cuisine_type"):
+                conditions.append(lambda d: d.get("cuisine_type") == filters["cuisine_type"])
+            if filters.get("category"):
+                conditions.append(lambda d: d.get("category") == filters["category"])
+            if filters.get("halal") is not None:
+                conditions.append(lambda d: d.get("dietary_info", {}).get("halal") == filters["halal"])
+            if filters.get("vegetarian") is not None:
+                conditions.append(
+                    lambda d: d.get("dietary_info", {}).get("vegetarian") == filters["vegetarian"]
+                )
+
+        # Embeddings are unit length, so the dot product is the cosine similarity.
+        # With int8 the sum is exact integer arithmetic, rescaled afterwards
+        scored = (
+            (sum(map(operator.mul, vector, query_vector)) * scale * query_scale, dish)
+            for vector, scale, dish in local_index
+            if all(condition(dish) for condition in conditions)
+        )
+        top = heapq.nlargest(limit, scored, key=operator.itemgetter(0))
+
+        # Atlas reports dotProduct scores normalized to [0, 1]
+        return [
+            {**{f: dish[f] for f in fields if f in dish}, "relevance_score": (1 + dot) / 2}
+            for dot, dish in top
+        ]
+
+    def _local_query_vector(self, embedding: List[float]) -> Tuple[Sequence[float], float]:
+        """Encode a query embedding like the in-memory index."""
+        if self.local_int8:
+            return quantize_int8(embedding)
+        return embedding, 1.0
+
+    def invalidate(self) -> None:
+        """Drop cached vector search results (after the dishes change)."""
+        with self._search_lock:
+            self._search_cache.clear()
+        with self._local_lock:
+            self._local_index = None
+            self._local_expiry = 0.0
+
     def get_all_dishes(self) -> List[Dict[str, Any]]:
         """Get all dishes (for testing)."""
         return list(self.collection.find({}, {"embedding": 0}))
 
+    def filter_by_dietary_flags(
+        self, flags_mask: int, fields: Sequence[str] = _RESULT_FIELDS
+    ) -> List[Dict[str, Any]]:
+        """
+        Get dishes that satisfy every dietary flag in a bitmask.
+
+        Args:
+            flags_mask: Required flags (e.g. HALAL | VEGETARIAN from data.malaysian_dishes)
+            fields: Dish fields to return
+
+        Returns:
+            Matching dishes, sorted by name
+        """
+        return list(self.collection.find(
+            {"dietary_flags": {"$bitsAllSet": flags_mask}},
+            {"_id": 0, **dict.fromkeys(fields, 1)},
+        ).sort("name", 1))
+
     def clear_all_dishes(self) -> None:
-        """Clear all dishes (for testing)."""
-        self.collection.delete_many({})
+        """
+        Clear all dishes (for testing).
+
+        Drops the collection rather than deleting document by document;
+        this also removes its vector search index, so recreate it afterwards.
+        """
+        if self.collection_name in self.db.list_collection_names():
+            self.db.drop_collection(self.collection_name)
+        self.collection = self.db[self.collection_name]
+        self.invalidate()
         print("Cleared all dishes")
 
     def _create_text_representation(self, dish: Dict[str, Any]) -> str:
@@ -301,25 +770,4 @@ class MongoDBFoodKnowledgeService:
         Returns:
             Text representation
         """
-        dietary_info = []
-        if dish['dietary_info'].get('halal'):
-            dietary_info.append('Halal')
-        if dish['dietary_info'].get('vegetarian'):
-            dietary_info.append('Vegetarian')
-        if dish['dietary_info'].get('vegan'):
-            dietary_info.append('Vegan')
-
-        return f"""
-Malaysian Dish: {dish['name']}
-Cuisine Type: {dish['cuisine_type']}
-Category: {dish['category']}
-Description: {dish['description']}
-Ingredients: {', '.join(dish['ingredients'])}
-Cooking Method: {dish.get('cooking_method', 'Not specified')}
-Taste Profile: {', '.join(dish['taste_profile'])}
-Dietary: {', '.join(dietary_info) if dietary_info else 'None specified'}
-Cultural Significance: {dish.get('cultural_significance', 'N/A')}
-Typical Meal Time: {', '.join(dish['typical_meal_time'])}
-Regional Origin: {dish.get('regional_origin', 'Various regions')}
-Common Pairings: {', '.join(dish['common_pairings'])}
-        """.strip()
+        return dish_embedding_text(dish)
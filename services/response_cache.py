@@ -0,0 +1,206 @@
+"""Semantic response cache for agent answers using MongoDB vector search."""
+
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+from pymongo.collection import Collection
+from services.mongodb import MongoDBFoodKnowledgeService, pack_embedding
+
+# Place names (and common aliases) that change an answer's meaning; queries
+# only match cached answers for the same places
+_LOCATION_ALIASES = {
+    "kuala lumpur": "kuala lumpur",
+    "kl": "kuala lumpur",
+    "penang": "penang",
+    "pulau pinang": "penang",
+    "george town": "penang",
+    "georgetown": "penang",
+    "ipoh": "ipoh",
+    "perak": "perak",
+    "melaka": "melaka",
+    "malacca": "melaka",
+    "johor bahru": "johor bahru",
+    "jb": "johor bahru",
+    "johor": "johor",
+    "selangor": "selangor",
+    "petaling jaya": "petaling jaya",
+    "pj": "petaling jaya",
+    "shah alam": "shah alam",
+    "subang": "subang",
+    "klang": "klang",
+    "putrajaya": "putrajaya",
+    "seremban": "seremban",
+    "negeri sembilan": "negeri sembilan",
+    "kuantan": "kuantan",
+    "pahang": "pahang",
+    "cameron highlands": "cameron highlands",
+    "kota bharu": "kota bharu",
+    "kelantan": "kelantan",
+    "kuala terengganu": "kuala terengganu",
+    "terengganu": "terengganu",
+    "alor setar": "alor setar",
+    "kedah": "kedah",
+    "langkawi": "langkawi",
+    "perlis": "perlis",
+    "kota kinabalu": "kota kinabalu",
+    "sabah": "sabah",
+    "kuching": "kuching",
+    "sarawak": "sarawak",
+    "miri": "miri",
+}
+
+# Longest aliases first, so "kuala terengganu" wins over "terengganu"
+_LOCATION_PATTERN = re.compile(
+    r"\b(" + "|".join(map(re.escape, sorted(_LOCATION_ALIASES, key=len, reverse=True))) + r")\b"
+)
+
+
+def extract_location(query: str) -> str:
+    """
+    Get the places a query mentions, as a cache partition key.
+
+    Args:
+        query: User query
+
+    Returns:
+        Canonical place names, sorted and comma-separated ("" when none)
+    """
+    found = {_LOCATION_ALIASES[match] for match in _LOCATION_PATTERN.findall(query.lower())}
+    return ",".join(sorted(found))
+
+
+class SemanticResponseCache:
+    """Cache agent responses keyed by query embedding similarity."""
+
+    INDEX_NAME = "response_cache_index"
+
+    def __init__(
+        self,
+        mongo_service: MongoDBFoodKnowledgeService,
+        collection: str = "response_cache",
+        threshold: float = 0.95,
+        ttl_seconds: int = 24 * 3600,
+    ):
+        """
+        Initialize semantic response cache.
+
+        Args:
+            mongo_service: MongoDB service (its database and Bedrock service are reused)
+            collection: Collection name for cached responses
+            threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: How long cached responses live before MongoDB expires them
+        """
+        self.mongo_service = mongo_service
+        self.collection_name = collection
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.collection: Optional[Collection] = None
+
+    def connect(self) -> None:
+        """Bind the cache collection and ensure its TTL index exists."""
+        self.collection = self.mongo_service.db[self.collection_name]
+        self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+
+    def create_vector_search_index(self) -> None:
+        """Create (or update) the vector search index used for cache lookups."""
+        definition = {
+            "fields": [
+                {
+                    "type": "vector",
+                    "path": "embedding",
+                    "numDimensions": 1024,
+                    "similarity": "dotProduct"
+                },
+                {
+                    "type": "filter",
+                    "path": "location"
+                }
+            ]
+        }
+        try:
+            self.collection.create_search_index({
+                "name": self.INDEX_NAME,
+                "type": "vectorSearch",
+                "definition": definition,
+            })
+            print(f"✓ Vector search index '{self.INDEX_NAME}' created successfully")
+        except Exception as e:
+            if "already exists" in str(e).lower():
+                # Older indexes lack the location filter field that lookups need
+                self.collection.update_search_index(self.INDEX_NAME, definition)
+                print(f"✓ Vector search index '{self.INDEX_NAME}' already exists (definition updated)")
+            else:
+                print(f"Error creating response cache index: {e}")
+
+    def embed(self, query: str) -> List[float]:
+        """Generate the embedding used as the cache key for a query."""
+        return self.mongo_service.bedrock_service.generate_embedding(query)
+
+    def get(self, query: str, query_embedding: List[float]) -> Optional[str]:
+        """
+        Look up a cached response for a semantically similar query.
+
+        Only responses for queries naming the same places are considered, so
+        "laksa in Penang" never matches a cached "laksa in Ipoh".
+
+        Args:
+            query: Incoming query text
+            query_embedding: Embedding of the incoming query
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if self.collection is None:
+            return None
+
+        pipeline = [
+            {
+                "$vectorSearch": {
+                    "index": self.INDEX_NAME,
+                    "path": "embedding",
+                    "queryVector": pack_embedding(query_embedding),
+                    "numCandidates": 10,
+                    "limit": 1,
+                    "filter": {"location": extract_location(query)},
+                }
+            },
+            {"$project": {"_id": 0, "response": 1, "score": {"$meta": "vectorSearchScore"}}},
+        ]
+
+        try:
+            for doc in self.collection.aggregate(pipeline):
+                # Embeddings are unit-length, so the dot product is the cosine;
+                # Atlas normalizes it to [0, 1] as (1 + cosine) / 2
+                if doc["score"] * 2 - 1 >= self.threshold:
+                    return doc["response"]
+        except Exception as e:
+            print(f"Response cache lookup failed: {e}")
+        return None
+
+    def put(self, query: str, query_embedding: List[float], response: str) -> None:
+        """
+        Store a response in the cache.
+
+        Args:
+            query: Original query text
+            query_embedding: Embedding of the query
+            response: Agent response to cache
+        """
+        if self.collection is None:
+            return
+
+        try:
+            self.collection.insert_one({
+                "query": query,
+                "embedding": pack_embedding(query_embedding),
+                "location": extract_location(query),
+                "response": response,
+                "created_at": datetime.now(timezone.utc),
+            })
+        except Exception as e:
+            print(f"Response cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        if self.collection is not None:
+            self.collection.delete_many({})
@@ -0,0 +1,225 @@
+"""Local website mapper for simple, server-rendered restaurant sites."""
+
+import asyncio
+import ipaddress
+import socket
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+# Redirect statuses followed hop by hop, so every target is checked
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+
+def is_public_address(address: str) -> bool:
+    """Check whether an IP address is globally routable (not loopback, private, link-local...)."""
+    try:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return False
+    return ip.is_global and not ip.is_multicast
+
+
+class _PublicResolver(AbstractResolver):
+    """Resolve host names to public addresses only, so fetches can't reach internal services."""
+
+    def __init__(self):
+        self._resolver = aiohttp.ThreadedResolver()
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        addresses = await self._resolver.resolve(host, port, family)
+        # Refuse the host outright if any record is internal (guards DNS rebinding)
+        if not addresses or not all(is_public_address(a["host"]) for a in addresses):
+            raise OSError(f"Refusing to fetch non-public host: {host}")
+        return addresses
+
+    async def close(self) -> None:
+        await self._resolver.close()
+
+
+def _is_allowed_url(url: str) -> bool:
+    """Check a URL's scheme, and its host when it is a literal IP (aiohttp skips the resolver for those)."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        ipaddress.ip_address(parts.hostname.split("%", 1)[0])
+    except ValueError:
+        return True  # Host name: checked by _PublicResolver on connect
+    return is_public_address(parts.hostname)
+
+
+class _LinkParser(HTMLParser):
+    """Collect href targets of <a> tags."""
+
+    def __init__(self):
+        super().__init__()
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value:
+                    self.links.append(value)
+
+
+def extract_links(html: str, page_url: str) -> List[str]:
+    """
+    Get the absolute same-host links on a page.
+
+    Args:
+        html: Page HTML
+        page_url: URL the page was fetched from
+
+    Returns:
+        Absolute URLs without fragments, in page order
+    """
+    parser = _LinkParser()
+    parser.feed(html)
+
+    host = urlsplit(page_url).netloc
+    links = []
+    for href in parser.links:
+        url = urldefrag(urljoin(page_url, href)).url
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https") and parts.netloc == host:
+            links.append(url)
+    return links
+
+
+class SiteMapper:
+    """Discover a site's pages with plain GETs instead of a paid API call."""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_concurrency: int = 8,
+        max_page_bytes: int = 1024 * 1024,
+        max_redirects: int = 5,
+    ):
+        """
+        Initialize site mapper.
+
+        Args:
+            timeout: Total timeout per page in seconds
+            max_connections: Maximum open connections in the pool
+            max_concurrency: Maximum pages fetched at once
+            max_page_bytes: Bytes of each page read (the rest is ignored)
+            max_redirects: Maximum redirects followed per page
+        """
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_page_bytes = max_page_bytes
+        self.max_redirects = max_redirects
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._gate = asyncio.Semaphore(max_concurrency)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use inside the running loop."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                # URLs come from the model, so only public hosts may be reached
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    ttl_dns_cache=300,
+                    resolver=_PublicResolver(),
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def close(self) -> None:
+        """Close the shared session."""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def _fetch(self, url: str) -> Optional[Tuple[str, str]]:
+        """
+        Fetch a page's HTML, following redirects to public hosts only.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            (final URL, HTML truncated to max_page_bytes), or None if the page
+            isn't reachable as an HTML 200 response
+        """
+        async with self._gate:
+            try:
+                for _ in range(self.max_redirects + 1):
+                    if not _is_allowed_url(url):
+                        return None
+                    async with self._get_session().get(url, allow_redirects=False) as response:
+                        if response.status in _REDIRECT_STATUSES and "Location" in response.headers:
+                            url = urldefrag(urljoin(url, response.headers["Location"])).url
+                            continue
+                        if response.status != 200 or response.content_type != "text/html":
+                            return None
+                        body = bytearray()
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            body += chunk
+                            if len(body) >= self.max_page_bytes:
+                                break
+                        html = bytes(body[:self.max_page_bytes])
+                        return url, html.decode(response.charset or "utf-8", errors="replace")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError, LookupError):
+                return None
+
+    async def map(self, url: str, max_depth: int = 1, max_pages: int = 100) -> Optional[Dict[str, Any]]:
+        """
+        Map a website breadth-first, fetching each level's pages concurrently.
+
+        Args:
+            url: Base URL to map
+            max_depth: How many link levels to follow
+            max_pages: Stop after discovering this many URLs
+
+        Returns:
+            Discovered URLs in Tavily's map response shape, or None when the
+            base page can't be fetched or has no same-host links (e.g. it
+            renders them with JavaScript)
+        """
+        root = await self._fetch(url)
+        if root is None:
+            return None
+
+        # Links are matched against the host the site redirected to
+        final_url, html = root
+        host = urlsplit(final_url).netloc
+        links = [link for link in extract_links(html, final_url) if link != final_url]
+        if not links:
+            return None
+
+        seen: Set[str] = {url, final_url}
+        found = [final_url]
+        level = []
+        for link in links:
+            if link not in seen and len(found) < max_pages:
+                seen.add(link)
+                found.append(link)
+                level.append(link)
+
+        for _ in range(max_depth - 1):
+            if not level or len(found) >= max_pages:
+                break
+            pages = await asyncio.gather(*(self._fetch(page) for page in level))
+            next_level = []
+            for page in pages:
+                # Skip pages that failed or redirected off the site
+                if page is None or urlsplit(page[0]).netloc != host:
+                    continue
+                for link in extract_links(page[1], page[0]):
+                    if link not in seen and len(found) < max_pages:
+                        seen.add(link)
+                        found.append(link)
+                        next_level.append(link)
+            level = next_level
+
+        return {"base_url": url, "results": found}
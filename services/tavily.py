@@ -0,0 +1,276 @@
+"""Tavily web search service with a shared, pooled HTTP session."""
+
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import aiohttp
+import orjson
+from utils.rate_limit import with_retry
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a search query and collapse whitespace, so trivial variants share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+def _first_results(result: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+    """Trim a search response to its top results (shares everything else)."""
+    results = result.get("results", [])
+    if len(results) <= max_results:
+        return result
+    return {**result, "results": results[:max_results]}
+
+
+class TavilyService:
+    """Service for Tavily search, extract, crawl and map API calls."""
+
+    BASE_URL = "https://api.tavily.com"
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        keepalive_timeout: float = 75.0,
+        max_concurrency: int = 5,
+        cache_size: int = 4096,
+        cache_ttl: float = 6 * 3600.0,
+    ):
+        """
+        Initialize Tavily service.
+
+        Args:
+            api_key: Tavily API key
+            timeout: Total timeout per request in seconds
+            max_connections: Maximum open connections in the pool
+            max_connections_per_host: Maximum open connections to api.tavily.com
+            keepalive_timeout: Seconds an idle connection stays open for reuse
+            max_concurrency: Maximum in-flight Tavily requests (stays under rate limits)
+            cache_size: Maximum search responses (and extracted pages) kept in memory
+            cache_ttl: Seconds a cached response stays valid; restaurant
+                listings change over days, not minutes
+        """
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._gate = asyncio.Semaphore(max_concurrency)
+
+        # Recent search responses: (query, depth, topic) -> (expiry, max_results, response).
+        # A response for more results also answers requests for fewer
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[Tuple, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Tuple[int, asyncio.Future]] = {}
+
+        # Recently extracted pages: (url, depth) -> (expiry, page result)
+        self._extract_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # Search outcomes: cache_hit, inflight_hit, miss
+        self.stats: Counter = Counter()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use inside the running loop."""
+        if self.session is None or self.session.closed:
+            # Base URL and auth header are bound once rather than built per request
+            self.session = aiohttp.ClientSession(
+                base_url=self.BASE_URL,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=self.max_connections_per_host,
+                    ttl_dns_cache=300,
+                    # aiohttp's 15s default drops the TLS connection between agent
+                    # turns; keep it long enough to span a user's think time
+                    keepalive_timeout=self.keepalive_timeout,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def close(self) -> None:
+        """Close the shared session."""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a request to the Tavily API.
+
+        Args:
+            endpoint: API endpoint (e.g., 'search')
+            payload: JSON request body
+
+        Returns:
+            Parsed JSON response
+        """
+        if not self.api_key:
+            raise ValueError("TAVILY_API_KEY is not set")
+
+        async def post() -> Dict[str, Any]:
+            async with self._gate:
+                async with self._get_session().post(f"/{endpoint}", json=payload) as response:
+                    response.raise_for_status()
+                    return orjson.loads(await response.read())
+
+        # Retry 429/503 responses with backoff
+        return await with_retry(post)
+
+    async def search(
+        self,
+        query: str,
+        search_depth: str = "basic",
+        max_results: int = 5,
+        topic: str = "general",
+    ) -> Dict[str, Any]:
+        """
+        Run a Tavily web search.
+
+        Args:
+            query: Search query
+            search_depth: 'basic' or 'advanced'
+            max_results: Maximum number of results
+            topic: Search topic (e.g., 'general', 'news')
+
+        Returns:
+            Search results (shared with the cache; do not mutate)
+        """
+        query = normalize_query(query)
+        key = (query, search_depth, topic)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] >= time.monotonic() and entry[1] >= max_results:
+            self._cache.move_to_end(key)
+            self._record("cache_hit", query)
+            return _first_results(entry[2], max_results)
+
+        # The same search already in flight (from any tool) shares one request
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] >= max_results:
+            self._record("inflight_hit", query)
+            return _first_results(await asyncio.shield(inflight[1]), max_results)
+
+        self._record("miss", query)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (max_results, future)
+        try:
+            result = await self._post("search", {
+                "query": query,
+                "search_depth": search_depth,
+                "max_results": max_results,
+                "topic": topic,
+            })
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody else is waiting
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(key, (0, None))[1] is future:
+                del self._inflight[key]
+
+        # Keep a concurrently cached response for more results if it is still fresh
+        current = self._cache.get(key)
+        if current is None or current[1] <= max_results or current[0] < time.monotonic():
+            self._cache[key] = (time.monotonic() + self.cache_ttl, max_results, result)
+            self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _record(self, outcome: str, query: str) -> None:
+        """Count a search outcome (cache hit rate = cache_hit / total)."""
+        self.stats[outcome] += 1
+        logger.debug("tavily search %s: %s", outcome, query)
+
+    async def extract(self, urls: List[str], extract_depth: str = "basic") -> Dict[str, Any]:
+        """
+        Extract page content from URLs.
+
+        Args:
+            urls: URLs to extract
+            extract_depth: 'basic' or 'advanced'
+
+        Returns:
+            Extracted content per URL
+        """
+        # Only pages not extracted recently are sent to Tavily
+        now = time.monotonic()
+        cached = []
+        missing = []
+        for url in urls:
+            entry = self._extract_cache.get((url, extract_depth))
+            if entry is not None and entry[0] >= now:
+                self._extract_cache.move_to_end((url, extract_depth))
+                cached.append(entry[1])
+            else:
+                missing.append(url)
+
+        if not missing:
+            return {"results": cached, "failed_results": []}
+
+        result = await self._post("extract", {"urls": missing, "extract_depth": extract_depth})
+
+        expiry = time.monotonic() + self.cache_ttl
+        for page in result.get("results", []):
+            self._extract_cache[(page.get("url"), extract_depth)] = (expiry, page)
+            self._extract_cache.move_to_end((page.get("url"), extract_depth))
+        while len(self._extract_cache) > self.cache_size:
+            self._extract_cache.popitem(last=False)
+
+        if cached:
+            result = {**result, "results": cached + result.get("results", [])}
+        return result
+
+    async def crawl(
+        self,
+        url: str,
+        max_depth: int = 1,
+        instructions: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Crawl a website starting from a base URL.
+
+        Args:
+            url: Base URL to crawl
+            max_depth: How many link levels to follow
+            instructions: Natural language guidance for what to collect
+
+        Returns:
+            Crawled pages and content
+        """
+        payload: Dict[str, Any] = {"url": url, "max_depth": max_depth}
+        if instructions:
+            payload["instructions"] = instructions
+        return await self._post("crawl", payload)
+
+    async def map(
+        self,
+        url: str,
+        max_depth: int = 1,
+        instructions: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Map the page structure of a website.
+
+        Args:
+            url: Base URL to map
+            max_depth: How many link levels to follow
+            instructions: Natural language guidance for which pages to include
+
+        Returns:
+            Discovered URLs
+        """
+        payload: Dict[str, Any] = {"url": url, "max_depth": max_depth}
+        if instructions:
+            payload["instructions"] = instructions
+        return await self._post("map", payload)
@@ -1,9 +1,24 @@
 """Food Knowledge Skill - Provides information about Malaysian dishes from MongoDB."""
 
-import json
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, Optional, Sequence
+import orjson
 from strands import tool
 from services.mongodb import MongoDBFoodKnowledgeService
+from data.malaysian_dishes import (
+    CATEGORIES, CUISINE_TYPES, HALAL, VEGETARIAN, VEGAN, GLUTEN_FREE,
+)
+
+
+def _match_facet(value: str, choices: Sequence[str]) -> Optional[str]:
+    """Match a facet value case-insensitively against the known values."""
+    folded = value.strip().casefold()
+    return next((choice for choice in choices if choice.casefold() == folded), None)
+
+
+def _unknown_facet(name: str, value: str, choices: Sequence[str]) -> str:
+    """Error for a facet value no dish has, listing the valid ones."""
+    return orjson.dumps({"error": f"Unknown {name} '{value}'", f"available_{name}s": choices}).decode()
 
 
 class FoodKnowledgeSkill:
@@ -19,7 +34,7 @@ class FoodKnowledgeSkill:
         self.mongo_service = mongo_service
 
     @tool
-    def search_dishes(
+    async def search_dishes(
         self,
         query: str,
         cuisine_type: str | None = None,
@@ -37,7 +52,7 @@ class FoodKnowledgeSkill:
         Args:
             query: Natural language query about Malaysian food (e.g., "spicy coconut milk dishes", "breakfast foods")
             cuisine_type: Filter by cuisine (Malay, Chinese Malaysian, Indian Malaysian, Nyonya, Mamak)
-            category: Filter by category (Main course, Dessert, Beverage, Snack)
+            category: Filter by category (Main course, Dessert, Beverage)
             halal: Filter by halal status (True/False/None)
             vegetarian: Filter by vegetarian status (True/False/None)
             limit: Maximum number of results (default 5)
@@ -45,41 +60,61 @@ class FoodKnowledgeSkill:
         Returns:
             JSON string with dish information including ingredients, cooking methods, taste profiles, cultural significance
         """
+        # Unknown facets can't match any dish, so answer without a search
         filters = {}
         if cuisine_type:
-            filters["cuisine_type"] = cuisine_type
+            filters["cuisine_type"] = _match_facet(cuisine_type, CUISINE_TYPES)
+            if filters["cuisine_type"] is None:
+                return _unknown_facet("cuisine_type", cuisine_type, CUISINE_TYPES)
         if category:
-            filters["category"] = category
+            filters["category"] = _match_facet(category, CATEGORIES)
+            if filters["category"] is None:
+                return _unknown_facet("category", category, CATEGORIES)
         if halal is not None:
             filters["halal"] = halal
         if vegetarian is not None:
             filters["vegetarian"] = vegetarian
 
-        results = self.mongo_service.vector_search(query, limit, filters)
-
-        # Format results for the agent
-        formatted_results = []
-        for r in results:
-            formatted_results.append({
-                "name": r["name"],
-                "cuisine_type": r["cuisine_type"],
-                "category": r["category"],
-                "description": r["description"],
-                "ingredients": r["ingredients"],
-                "cooking_method": r.get("cooking_method"),
-                "taste_profile": r["taste_profile"],
-                "dietary_info": r["dietary_info"],
-                "cultural_significance": r.get("cultural_significance"),
-                "typical_meal_time": r["typical_meal_time"],
-                "regional_origin": r.get("regional_origin"),
-                "common_pairings": r["common_pairings"],
-                "relevance_score": r.get("score", 0),
-            })
-
-        return json.dumps(formatted_results, indent=2)
+        # Run the blocking search off the event loop; $project already shaped
+        # each result for the agent
+        results = await asyncio.to_thread(self.mongo_service.vector_search, query, limit, filters)
+
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()
+
+    async def _get_dish(self, dish_name: str) -> Dict[str, Any] | None:
+        """Find the best-matching dish, reusing the service's search cache."""
+        results = await asyncio.to_thread(self.mongo_service.vector_search, dish_name, 1)
+        return results[0] if results else None
+
+    @tool
+    async def get_dish_details(self, dish_name: str) -> str:
+        """
+        Get ingredients, cooking method, dietary and taste information for a Malaysian dish.
+
+        Prefer this over calling get_dish_ingredients and get_dietary_info separately.
+
+        Args:
+            dish_name: Name of the dish (e.g., "Nasi Lemak", "Rendang")
+
+        Returns:
+            JSON string with ingredients, cooking method, dietary info, taste profile and regional origin
+        """
+        dish = await self._get_dish(dish_name)
+
+        if dish is None:
+            return orjson.dumps({"error": f"No information found for {dish_name}"}).decode()
+
+        return orjson.dumps({
+            "name": dish["name"],
+            "ingredients": dish["ingredients"],
+            "cooking_method": dish.get("cooking_method", "Not specified"),
+            "dietary_info": dish["dietary_info"],
+            "taste_profile": dish["taste_profile"],
+            "regional_origin": dish.get("regional_origin"),
+        }, option=orjson.OPT_INDENT_2).decode()
 
     @tool
-    def get_dish_ingredients(self, dish_name: str) -> str:
+    async def get_dish_ingredients(self, dish_name: str) -> str:
         """
         Get ingredients for a specific Malaysian dish.
 
@@ -89,20 +124,19 @@ class FoodKnowledgeSkill:
         Returns:
             JSON string with detailed ingredient list and cooking method
         """
-        results = self.mongo_service.vector_search(dish_name, limit=1)
+        dish = await self._get_dish(dish_name)
 
-        if not results:
-            return json.dumps({"error": f"No information found for {dish_name}"})
+        if dish is None:
+            return orjson.dumps({"error": f"No information found for {dish_name}"}).decode()
 
-        dish = results[0]
-        return json.dumps({
+        return orjson.dumps({
             "name": dish["name"],
             "ingredients": dish["ingredients"],
             "cooking_method": dish.get("cooking_method", "Not specified")
-        }, indent=2)
+        }, option=orjson.OPT_INDENT_2).decode()
 
     @tool
-    def get_dietary_info(self, dish_name: str) -> str:
+    async def get_dietary_info(self, dish_name: str) -> str:
         """
         Get dietary information for a Malaysian dish.
 
@@ -112,20 +146,19 @@ class FoodKnowledgeSkill:
         Returns:
             JSON string with dietary information (halal, vegetarian, vegan, gluten-free)
         """
-        results = self.mongo_service.vector_search(dish_name, limit=1)
+        dish = await self._get_dish(dish_name)
 
-        if not results:
-            return json.dumps({"error": f"No information found for {dish_name}"})
+        if dish is None:
+            return orjson.dumps({"error": f"No information found for {dish_name}"}).decode()
 
-        dish = results[0]
-        return json.dumps({
+        return orjson.dumps({
             "name": dish["name"],
             "dietary_info": dish["dietary_info"],
             "ingredients": dish["ingredients"]
-        }, indent=2)
+        }, option=orjson.OPT_INDENT_2).decode()
 
     @tool
-    def explore_cuisine_type(self, cuisine_type: str) -> str:
+    async def explore_cuisine_type(self, cuisine_type: str) -> str:
         """
         Explore dishes from a specific Malaysian cuisine type.
 
@@ -135,19 +168,55 @@ class FoodKnowledgeSkill:
         Returns:
             JSON string with dishes from that cuisine type
         """
-        results = self.mongo_service.vector_search(
-            cuisine_type,
+        matched = _match_facet(cuisine_type, CUISINE_TYPES)
+        if matched is None:
+            return _unknown_facet("cuisine_type", cuisine_type, CUISINE_TYPES)
+
+        results = await asyncio.to_thread(
+            self.mongo_service.vector_search,
+            matched,
             limit=10,
-            filters={"cuisine_type": cuisine_type}
+            filters={"cuisine_type": matched},
+            fields=("name", "description", "category", "typical_meal_time"),
+        )
+
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()
+
+    @tool
+    async def find_dishes_by_diet(
+        self,
+        halal: bool = False,
+        vegetarian: bool = False,
+        vegan: bool = False,
+        gluten_free: bool = False,
+    ) -> str:
+        """
+        List every Malaysian dish that meets the given dietary requirements.
+
+        Use this for dietary listings ("which dishes are vegan and gluten-free?");
+        it matches exactly, without a similarity search.
+
+        Args:
+            halal: Only halal dishes
+            vegetarian: Only vegetarian dishes
+            vegan: Only vegan dishes
+            gluten_free: Only gluten-free dishes
+
+        Returns:
+            JSON string with the matching dishes' names, cuisine, category and dietary info
+        """
+        flags_mask = (
+            (HALAL if halal else 0)
+            | (VEGETARIAN if vegetarian else 0)
+            | (VEGAN if vegan else 0)
+            | (GLUTEN_FREE if gluten_free else 0)
         )
 
-        formatted_results = []
-        for r in results:
-            formatted_results.append({
-                "name": r["name"],
-                "description": r["description"],
-                "category": r["category"],
-                "typical_meal_time": r["typical_meal_time"]
-            })
+        # One $bitsAllSet match on the packed dietary_flags field
+        results = await asyncio.to_thread(
+            self.mongo_service.filter_by_dietary_flags,
+            flags_mask,
+            ("name", "cuisine_type", "category", "dietary_info"),
+        )
 
-        return json.dumps(formatted_results, indent=2)
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()
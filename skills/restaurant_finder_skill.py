@@ -1,23 +1,231 @@
-"""Restaurant Finder Skill - Finds restaurant locations using Tavily tools."""
-
+"""Restaurant Finder Skill - Finds restaurant locations using Tavily tools.
+
+Every tool is network-bound and several fan out concurrent requests, so run
+them on uvloop where available: main.py installs its loop policy and the API
+server runs under uvicorn with loop="auto" (uvloop comes with uvicorn[standard],
+or with the "fast" extra for the CLI).
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Dict, List, Optional, Sequence
 from strands import tool
-from strands_tools.tavily import tavily_search, tavily_extract, tavily_crawl, tavily_map
+from services.site_mapper import SiteMapper
+from services.tavily import TavilyService, normalize_query
+from utils.html_text import compact_text
+
+logger = logging.getLogger(__name__)
+
+# Basic-depth results are kept when they fill at least this share of the
+# requested results with at least this mean relevance score
+MIN_RESULT_FRACTION = 0.6
+MIN_MEAN_SCORE = 0.5
+
+# Search query templates; optional parts left empty collapse during normalization
+_QUERY_TEMPLATES = {
+    "find": "best {dish} restaurants in {location} Malaysia {extra}",
+    "halal": "halal {dish} restaurants in {location} Malaysia",
+    "cuisine": "best authentic {cuisine} restaurants in {location} Malaysia",
+    "reviews": "{restaurant} restaurant reviews {location} Malaysia",
+    "area": "best neighborhoods and areas for {dish} in {location} Malaysia food guide",
+    "blog": "{dish} {location} Malaysia food blog review",
+}
+
+
+def build_query(template: str, **parts: str) -> str:
+    """
+    Fill a search query template and normalize it.
+
+    Normalized queries are identical for the same inputs regardless of case or
+    spacing, which keeps the Tavily response cache effective.
+
+    Args:
+        template: Key into the query templates (e.g. 'find', 'halal')
+        **parts: Template values
+
+    Returns:
+        Lowercase query with single spaces
+    """
+    return normalize_query(_QUERY_TEMPLATES[template].format_map(parts))
+
+
+def is_sufficient(result: Dict[str, Any], max_results: int) -> bool:
+    """Check whether search results are plentiful and relevant enough to keep."""
+    results = result.get("results", [])
+    return (
+        len(results) >= max_results * MIN_RESULT_FRACTION
+        and sum(r.get("score", 0) for r in results) / len(results) >= MIN_MEAN_SCORE
+    )
+
+
+def merge_results(queries: Sequence[str], responses: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Merge several search responses, dropping duplicate URLs.
+
+    Args:
+        queries: Search queries, in the same order as responses
+        responses: Search results, or the exception a search raised
+
+    Returns:
+        Merged results, with an 'errors' entry for failed searches
+    """
+    seen = set()
+    results = []
+    errors = []
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            errors.append({"query": query, "error": str(response)})
+            continue
+        for item in response.get("results", []):
+            url = item.get("url")
+            if url in seen:
+                continue
+            seen.add(url)
+            results.append(item)
+
+    merged = {"queries": list(queries), "results": results}
+    if errors:
+        merged["errors"] = errors
+    return merged
+
+
+def json_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wrap a payload as a Strands tool result with JSON content.
+
+    The model receives the structure directly, so results are never encoded
+    to a string here only to be decoded again downstream.
+
+    Args:
+        payload: JSON-serializable tool output
+
+    Returns:
+        Tool result dict (Strands adds the toolUseId)
+    """
+    return {"status": "success", "content": [{"json": payload}]}
+
+
+# Most-asked dish and location pairs, searched ahead of time by prefetch_popular
+POPULAR_SEARCHES = (
+    ("Nasi Lemak", "Kuala Lumpur"),
+    ("Nasi Lemak", "Penang"),
+    ("Char Koay Teow", "Penang"),
+    ("Char Koay Teow", "Kuala Lumpur"),
+    ("Roti Canai", "Kuala Lumpur"),
+    ("Roti Canai", "Johor Bahru"),
+    ("Laksa", "Penang"),
+    ("Laksa", "Melaka"),
+    ("Satay", "Kajang"),
+    ("Rendang", "Kuala Lumpur"),
+    ("Bak Kut Teh", "Klang"),
+    ("Nasi Kandar", "Penang"),
+)
+
+# Characters of page text kept per extracted or crawled page
+PAGE_TEXT_LIMIT = 8000
+
+
+def compact_pages(pages: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce extracted pages to their visible text.
+
+    Page markup and navigation chrome only cost the model tokens. Copies are
+    returned because Tavily pages are shared with the service's cache.
+
+    Args:
+        pages: Tavily pages with 'raw_content'
+
+    Returns:
+        Pages with compacted, truncated 'raw_content'
+    """
+    return [
+        {**page, "raw_content": compact_text(page["raw_content"], PAGE_TEXT_LIMIT)}
+        if page.get("raw_content") else page
+        for page in pages
+    ]
+
+
+# URLs per Tavily extract request; shards are fetched concurrently
+EXTRACT_SHARD_SIZE = 5
 
 
 class RestaurantFinderSkill:
     """
     Skill for finding restaurant locations using Tavily tools.
 
-    Tavily Tools:
-    - tavily_search: Real-time web search optimized for AI agents
-    - tavily_extract: Extract clean content from restaurant web pages
-    - tavily_crawl: Crawl restaurant websites for detailed information
-    - tavily_map: Map website structure to discover all pages
+    Tavily APIs:
+    - search: Real-time web search optimized for AI agents
+    - extract: Extract clean content from restaurant web pages
+    - crawl: Crawl restaurant websites for detailed information
+    - map: Map website structure to discover all pages
     """
 
-    def __init__(self):
-        """Initialize restaurant finder skill."""
-        pass
+    def __init__(self, tavily_service: TavilyService, site_mapper: Optional[SiteMapper] = None):
+        """
+        Initialize restaurant finder skill.
+
+        Args:
+            tavily_service: Tavily service with a shared HTTP session
+            site_mapper: Local mapper tried before Tavily map (created if omitted)
+        """
+        self.tavily_service = tavily_service
+        self.site_mapper = site_mapper or SiteMapper()
+
+        # Search presets with the constant arguments bound once
+        self._search_basic = functools.partial(
+            tavily_service.search, search_depth="basic", topic="general"
+        )
+        self._search_advanced = functools.partial(
+            tavily_service.search, search_depth="advanced", topic="general"
+        )
+
+    async def close(self) -> None:
+        """Close the local site mapper's HTTP session."""
+        await self.site_mapper.close()
+
+    async def prefetch_popular(self, max_concurrency: int = 3) -> None:
+        """
+        Run find_restaurants' search for the popular dish and location pairs.
+
+        Results land in TavilyService's cache, so the most common questions
+        are answered without waiting on Tavily.
+
+        Args:
+            max_concurrency: Maximum prefetch searches in flight (leaves room for users)
+        """
+        gate = asyncio.Semaphore(max_concurrency)
+
+        async def prefetch(dish_name: str, location: str) -> None:
+            async with gate:
+                try:
+                    query = build_query("find", dish=dish_name, location=location, extra="")
+                    await self._tiered_search(query, max_results=8)
+                except Exception as e:
+                    logger.debug("Prefetch failed for %s in %s: %s", dish_name, location, e)
+
+        await asyncio.gather(*(prefetch(d, l) for d, l in POPULAR_SEARCHES))
+
+    async def _tiered_search(self, query: str, max_results: int) -> Dict[str, Any]:
+        """
+        Search at basic depth, escalating to advanced only for weak results.
+
+        Advanced searches take roughly twice as long and cost twice the credits,
+        and most restaurant queries are answered well at basic depth.
+
+        Args:
+            query: Search query
+            max_results: Maximum number of results
+
+        Returns:
+            Search results
+        """
+        basic = await self._search_basic(query, max_results=max_results)
+
+        if is_sufficient(basic, max_results):
+            return basic
+
+        return await self._search_advanced(query, max_results=max_results)
 
     @tool
     async def find_restaurants(
@@ -25,7 +233,7 @@ class RestaurantFinderSkill:
         dish_name: str,
         location: str,
         additional_criteria: str | None = None
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
         Find restaurants serving a specific Malaysian dish in a location.
 
@@ -40,19 +248,44 @@ class RestaurantFinderSkill:
         Returns:
             Search results with restaurant information
         """
-        query = f"best {dish_name} restaurants in {location} Malaysia"
-        if additional_criteria:
-            query += f" {additional_criteria}"
+        query = build_query("find", dish=dish_name, location=location, extra=additional_criteria or "")
+
+        result = await self._tiered_search(query, max_results=8)
+        return json_result(result)
+
+    @tool
+    async def find_restaurants_comprehensive(self, dish_name: str, location: str) -> Dict[str, Any]:
+        """
+        Find restaurants for a dish using several searches at once.
+
+        Runs the general, halal, food blog and best-area searches in parallel
+        and merges their results, so one call covers what would otherwise take
+        four sequential tool calls.
+
+        Args:
+            dish_name: Name of Malaysian dish (e.g., "Nasi Lemak", "Char Koay Teow")
+            location: Location in Malaysia (city, state, area)
 
-        return await tavily_search(
-            query=query,
-            search_depth="advanced",
-            max_results=8,
-            topic="general"
+        Returns:
+            Merged search results, deduplicated by URL
+        """
+        queries = (
+            build_query("find", dish=dish_name, location=location, extra=""),
+            build_query("halal", dish=dish_name, location=location),
+            build_query("blog", dish=dish_name, location=location),
+            build_query("area", dish=dish_name, location=location),
         )
 
+        # TavilyService caps in-flight requests, so the fan-out stays under rate limits
+        responses = await asyncio.gather(
+            *(self._tiered_search(query, max_results=8) for query in queries),
+            return_exceptions=True,
+        )
+
+        return json_result(merge_results(queries, responses))
+
     @tool
-    async def find_halal_restaurants(self, dish_name: str, location: str) -> str:
+    async def find_halal_restaurants(self, dish_name: str, location: str) -> Dict[str, Any]:
         """
         Find halal restaurants serving a specific dish.
 
@@ -63,17 +296,13 @@ class RestaurantFinderSkill:
         Returns:
             Search results for halal restaurants
         """
-        query = f"halal {dish_name} restaurants in {location} Malaysia"
+        query = build_query("halal", dish=dish_name, location=location)
 
-        return await tavily_search(
-            query=query,
-            search_depth="advanced",
-            max_results=8,
-            topic="general"
-        )
+        result = await self._tiered_search(query, max_results=8)
+        return json_result(result)
 
     @tool
-    async def find_restaurants_by_cuisine(self, cuisine_type: str, location: str) -> str:
+    async def find_restaurants_by_cuisine(self, cuisine_type: str, location: str) -> Dict[str, Any]:
         """
         Find restaurants by Malaysian cuisine type in a location.
 
@@ -84,21 +313,17 @@ class RestaurantFinderSkill:
         Returns:
             Search results for restaurants
         """
-        query = f"best authentic {cuisine_type} restaurants in {location} Malaysia"
+        query = build_query("cuisine", cuisine=cuisine_type, location=location)
 
-        return await tavily_search(
-            query=query,
-            search_depth="advanced",
-            max_results=8,
-            topic="general"
-        )
+        result = await self._tiered_search(query, max_results=8)
+        return json_result(result)
 
     @tool
     async def get_restaurant_reviews(
         self,
         restaurant_name: str,
         location: str | None = None
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
         Get reviews and current information about a specific restaurant.
 
@@ -109,20 +334,13 @@ class RestaurantFinderSkill:
         Returns:
             Search results with reviews and restaurant information
         """
-        query = f"{restaurant_name} restaurant reviews"
-        if location:
-            query += f" {location}"
-        query += " Malaysia"
+        query = build_query("reviews", restaurant=restaurant_name, location=location or "")
 
-        return await tavily_search(
-            query=query,
-            search_depth="advanced",
-            max_results=5,
-            topic="general"
-        )
+        result = await self._tiered_search(query, max_results=5)
+        return json_result(result)
 
     @tool
-    async def find_best_area_for_food(self, dish_or_cuisine: str, city: str) -> str:
+    async def find_best_area_for_food(self, dish_or_cuisine: str, city: str) -> Dict[str, Any]:
         """
         Find the best areas/neighborhoods in a city for specific food or cuisine.
 
@@ -133,17 +351,13 @@ class RestaurantFinderSkill:
         Returns:
             Information about best food areas and neighborhoods
         """
-        query = f"best neighborhoods and areas for {dish_or_cuisine} in {city} Malaysia food guide"
+        query = build_query("area", dish=dish_or_cuisine, location=city)
 
-        return await tavily_search(
-            query=query,
-            search_depth="advanced",
-            max_results=6,
-            topic="general"
-        )
+        result = await self._tiered_search(query, max_results=6)
+        return json_result(result)
 
     @tool
-    async def search_food_blogs(self, dish_name: str, location: str) -> str:
+    async def search_food_blogs(self, dish_name: str, location: str) -> Dict[str, Any]:
         """
         Search Malaysian food blogs and review sites for recommendations.
 
@@ -154,17 +368,13 @@ class RestaurantFinderSkill:
         Returns:
             Blog posts and articles about the dish
         """
-        query = f"{dish_name} {location} Malaysia food blog review"
+        query = build_query("blog", dish=dish_name, location=location)
 
-        return await tavily_search(
-            query=query,
-            search_depth="advanced",
-            max_results=5,
-            topic="general"
-        )
+        result = await self._tiered_search(query, max_results=5)
+        return json_result(result)
 
     @tool
-    async def extract_restaurant_details(self, urls: list[str]) -> str:
+    async def extract_restaurant_details(self, urls: list[str]) -> Dict[str, Any]:
         """
         Extract detailed information from restaurant websites or review pages.
 
@@ -177,18 +387,29 @@ class RestaurantFinderSkill:
         Returns:
             Extracted content from the URLs
         """
-        return await tavily_extract(
-            urls=urls,
-            extract_depth="advanced"
+        # Shard the URLs so one slow page only delays its own shard
+        shards = [urls[i:i + EXTRACT_SHARD_SIZE] for i in range(0, len(urls), EXTRACT_SHARD_SIZE)]
+        responses = await asyncio.gather(
+            *(self.tavily_service.extract(urls=shard, extract_depth="advanced") for shard in shards),
+            return_exceptions=True,
         )
 
+        result = {"results": [], "failed_results": []}
+        for shard, response in zip(shards, responses):
+            if isinstance(response, Exception):
+                result["failed_results"].extend({"url": url, "error": str(response)} for url in shard)
+                continue
+            result["results"].extend(compact_pages(response.get("results", [])))
+            result["failed_results"].extend(response.get("failed_results", []))
+        return json_result(result)
+
     @tool
     async def crawl_restaurant_website(
         self,
         url: str,
         max_depth: int = 2,
         instructions: str | None = None
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
         Crawl a restaurant website to find specific information like menus, locations, or contact details.
 
@@ -200,18 +421,19 @@ class RestaurantFinderSkill:
         Returns:
             Crawled content from the website
         """
-        return await tavily_crawl(
+        result = await self.tavily_service.crawl(
             url=url,
             max_depth=max_depth,
             instructions=instructions or "Find restaurant information, menu, location, and contact details"
         )
+        return json_result({**result, "results": compact_pages(result.get("results", []))})
 
     @tool
     async def map_restaurant_website(
         self,
         url: str,
         max_depth: int = 2
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
         Map out the structure of a restaurant website to discover all available pages.
 
@@ -222,8 +444,15 @@ class RestaurantFinderSkill:
         Returns:
             List of discovered URLs on the website
         """
-        return await tavily_map(
+        # Most restaurant sites are plain HTML; only fall back to Tavily for
+        # unreachable or JavaScript-rendered sites
+        result = await self.site_mapper.map(url, max_depth=max_depth)
+        if result is not None:
+            return json_result(result)
+
+        result = await self.tavily_service.map(
             url=url,
             max_depth=max_depth,
             instructions="Discover all pages on this restaurant website"
         )
+        return json_result(result)
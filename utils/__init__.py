@@ -0,0 +1 @@
+"""Utilities package for Malaysian Food Agent."""
@@ -0,0 +1,65 @@
+"""Reduce scraped page content to compact visible text for the model."""
+
+import re
+from html.parser import HTMLParser
+from typing import List
+
+# Elements whose text is page chrome or code rather than content
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "nav", "header", "footer"})
+
+# Elements that start a new line of text
+_BLOCK_TAGS = frozenset({
+    "p", "div", "br", "li", "tr", "td", "th", "section", "article", "table",
+    "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+})
+
+# Content that contains markup worth parsing
+_HTML_TAG = re.compile(r"<[a-zA-Z][^>]*>")
+
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\s*\n\s*")
+
+
+class _TextParser(HTMLParser):
+    """Collect visible text, skipping chrome and code elements."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def compact_text(content: str, max_chars: int = 8000) -> str:
+    """
+    Strip markup and collapse whitespace in page content.
+
+    Args:
+        content: Page content (HTML, markdown or plain text)
+        max_chars: Maximum characters kept
+
+    Returns:
+        Visible text with runs of spaces and blank lines collapsed, truncated to max_chars
+    """
+    if _HTML_TAG.search(content):
+        parser = _TextParser()
+        parser.feed(content)
+        parser.close()
+        content = "".join(parser.parts)
+    content = _BLANK_LINES.sub("\n", _SPACES.sub(" ", content))
+    return content.strip()[:max_chars]
@@ -0,0 +1,47 @@
+"""Non-blocking logging setup (records are formatted and written on a background thread)."""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+# Top-level packages of this app; third-party loggers stay at WARNING
+APP_LOGGERS = ("agent", "services", "skills", "utils", "data", "scripts")
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Route root logger output through a queue so callers never block on stderr.
+
+    The root logger stays at WARNING, so third-party INFO chatter (botocore,
+    aiohttp, pymongo) doesn't interrupt the CLI conversation; only the app's
+    own loggers use the given level.
+
+    Safe to call more than once; only the first call installs handlers.
+
+    Args:
+        level: Level for the app's loggers
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.WARNING)
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,66 @@
+"""Retry with exponential backoff for throttled Tavily calls."""
+
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying (Tavily)
+RETRYABLE_HTTP_STATUSES = frozenset({429, 503})
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether an error is a transient throttling/availability error."""
+    return isinstance(error, aiohttp.ClientResponseError) and error.status in RETRYABLE_HTTP_STATUSES
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Get the server-requested delay (Retry-After header) in seconds, if any."""
+    headers = error.headers if isinstance(error, aiohttp.ClientResponseError) else None
+    if not headers:
+        return None
+
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def with_retry(
+    op: Callable[[], Awaitable[T]],
+    max_retries: int = 5,
+    base: float = 1.0,
+    cap: float = 60.0,
+) -> T:
+    """
+    Run an async operation, retrying throttled calls with exponential backoff.
+
+    Args:
+        op: Zero-argument callable returning the awaitable to run
+        max_retries: Maximum number of retries after the first attempt
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Result of the operation
+    """
+    attempt = 0
+    while True:
+        try:
+            return await op()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+
+            delay = retry_after(e)
+            if delay is None:
+                delay = min(cap, base * 2 ** attempt) + random.random() * 0.5
+            logger.warning("Throttled (%s), retrying in %.1fs", e, delay)
+            await asyncio.sleep(delay)
+            attempt += 1